@@ -7,6 +7,14 @@ class Config:
     # Настройки сервера
     SERVER_HOST = os.getenv("AGENT_HOST", "0.0.0.0")
     SERVER_PORT = int(os.getenv("AGENT_PORT", 11011))
+    # HTTP сервер на asyncio (uvloop, если установлен) вместо ThreadingHTTPServer
+    USE_ASYNC = os.getenv("AGENT_USE_ASYNC", "false").lower() == "true"
+    # Сколько секунд asyncio сервер держит простаивающее keep-alive соединение
+    KEEPALIVE_TIMEOUT = float(os.getenv("AGENT_KEEPALIVE_TIMEOUT", 30))
+    # Форматировать JSON ответы с отступами всегда, а не только по ?pretty=1
+    DEBUG_JSON = os.getenv("AGENT_DEBUG_JSON", "false").lower() == "true"
+    # Максимальный размер тела POST запроса (байты), больше - ответ 413
+    MAX_POST_BYTES = int(os.getenv("AGENT_MAX_POST_BYTES", 1048576))
 
     # Настройки обнаружения
     DISCOVERY_INTERVAL_SECONDS = int(os.getenv("DISCOVERY_INTERVAL", 60))
@@ -27,6 +35,21 @@ class Config:
         "jar,war"
     ).split(',')    
 
+    # Количество потоков для параллельного опроса приложений SVC-плагином
+    SVC_DISCOVERY_WORKERS = int(os.getenv("SVC_DISCOVERY_WORKERS", 16))
+
+    # Время жизни кэша результатов SVC-плагина (секунды, 0 - без кэша)
+    SVC_DISCOVERY_CACHE_TTL = float(os.getenv("SVC_DISCOVERY_CACHE_TTL", 15))
+
+    # Типичные порты приложений, которые ищутся среди слушающих портов,
+    # если порт не удалось определить по server.xml или сокетам процесса
+    COMMON_APP_PORTS = tuple(
+        int(port) for port in os.getenv(
+            "COMMON_APP_PORTS",
+            "8080,8443,9090,8081,8082,8083"
+        ).split(',') if port.strip()
+    )
+
     # Настройки безопасности
     SECURITY_ENABLED = os.getenv("AGENT_SECURITY_ENABLED", "false").lower() == "true"
     AUTH_TOKEN = os.getenv("AGENT_AUTH_TOKEN", "default-please-change-me")
@@ -3,13 +3,20 @@ import importlib.util
 import inspect
 import logging
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from control import AbstractController
 from config import Config
 
 logger = logging.getLogger(__name__)
 
+# Обработчики контроллера: (handle_get, handle_action);
+# handle_get равен None, если контроллер не обрабатывает GET запросы
+ControllerHandlers = Tuple[
+    Optional[Callable[[List[str], Dict[str, str]], Dict[str, Any]]],
+    Callable[[List[str], Dict[str, Any]], Dict[str, Any]]
+]
+
 
 class ControlManager:
     """
@@ -21,6 +28,11 @@ class ControlManager:
     def __init__(self):
         """Инициализация менеджера контроллеров."""
         self.controllers: Dict[str, AbstractController] = {}
+
+        # Связанные методы контроллеров по имени: HTTP сервер получает
+        # обработчик одним поиском в словаре
+        self.handlers: Dict[str, ControllerHandlers] = {}
+
         self._load_controllers()
 
     def _load_controllers(self) -> None:
@@ -87,6 +99,13 @@ class ControlManager:
 
                     # Регистрируем контроллер
                     self.controllers[controller_name] = controller_instance
+                    # Поддержка GET определяется один раз при регистрации:
+                    # handle_get базового класса только сообщает, что GET нет
+                    supports_get = obj.handle_get is not AbstractController.handle_get
+                    self.handlers[controller_name] = (
+                        controller_instance.handle_get if supports_get else None,
+                        controller_instance.handle_action
+                    )
                     logger.info(f"  - Загружен контроллер: {controller_name} ({name})")
 
                 except Exception as e:
@@ -107,6 +126,22 @@ class ControlManager:
             logger.warning(f"Контроллер '{name}' не найден")
         return controller
 
+    def get_handlers(self, name: str) -> Optional[ControllerHandlers]:
+        """
+        Получает обработчики контроллера по имени.
+
+        Args:
+            name: Имя контроллера
+
+        Returns:
+            Optional[ControllerHandlers]: (handle_get, handle_action) или None,
+                                          если контроллер не найден
+        """
+        handlers = self.handlers.get(name)
+        if not handlers:
+            logger.warning(f"Контроллер '{name}' не найден")
+        return handlers
+
     def list_controllers(self) -> list[str]:
         """
         Возвращает список имен всех загруженных контроллеров.
@@ -238,7 +238,7 @@ class HAProxyController(AbstractController):
                 return self._success_response({
                     'instance': instance_name or 'default',
                     'backend': backend_name,
-                    'servers': servers,
+                    'servers': [server.as_dict() for server in servers],
                     'count': len(servers)
                 })
 
@@ -325,20 +325,19 @@ class HAProxyController(AbstractController):
             # Получаем клиента
             client = self._get_client(instance_name)
 
-            # Выполняем действие
+            # Выполняем действие и в том же запросе к HAProxy получаем
+            # состояние сервера после изменения
             logger.info(f"Установка состояния: {backend_name}/{server_name} -> {action}")
-            success = client.set_server_state(backend_name, server_name, action)
-
-            if success:
-                return self._success_response({
-                    'instance': instance_name or 'default',
-                    'backend': backend_name,
-                    'server': server_name,
-                    'action': action,
-                    'status': 'completed'
-                }, message=f"Server state successfully changed to '{action}'")
-            else:
-                return self._error_response("Failed to change server state", 500)
+            server_state = client.set_and_get_server_state(backend_name, server_name, action)
+
+            return self._success_response({
+                'instance': instance_name or 'default',
+                'backend': backend_name,
+                'server': server_name,
+                'action': action,
+                'status': 'completed',
+                'server_state': server_state.as_dict() if server_state else None
+            }, message=f"Server state successfully changed to '{action}'")
 
         except ValueError as e:
             logger.warning(f"Ошибка валидации: {e}")
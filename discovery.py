@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
 import importlib.util
 import inspect
+import threading
 from pathlib import Path
 
 from models import ApplicationInfo
@@ -26,6 +27,13 @@ class DiscoveryManager:
 
     def __init__(self):
         self.discoverers: List[AbstractDiscoverer] = []
+
+        # Последний снимок: (результаты плагинов, приложения). Свежесть
+        # данных определяют кэши плагинов; обнаружение выполняет только
+        # один поток, остальные ждут его результат
+        self._snapshot: Optional[Tuple[Tuple[List[ApplicationInfo], ...], Tuple[ApplicationInfo, ...]]] = None
+        self._refresh_lock = threading.Lock()
+
         self._load_plugins()
 
     def _load_plugins(self):
@@ -45,13 +53,46 @@ class DiscoveryManager:
                         self.discoverers.append(obj())
     
     def run_discovery(self) -> List[ApplicationInfo]:
-        """Запускает обнаружение на всех загруженных плагинах."""
-        all_apps = []
-        for discoverer in self.discoverers:
-            try:
-                apps = discoverer.discover()
-                all_apps.extend(apps)
-            except Exception as e:
-                logger.info(f"Error running discoverer {type(discoverer).__name__}: {e}")
-        
-        return all_apps
\ No newline at end of file
+        """
+        Возвращает приложения, обнаруженные всеми плагинами.
+
+        Кэширование выполняют сами плагины (например, SVCAppDiscoverer
+        по Config.SVC_DISCOVERY_CACHE_TTL и mtime директорий). Обнаружение
+        запускает первый обратившийся поток; потоки, пришедшие во время
+        обновления, получают его результат.
+        """
+        return list(self.get_snapshot())
+
+    def get_snapshot(self) -> Tuple[ApplicationInfo, ...]:
+        """
+        Возвращает результат обнаружения без копирования.
+
+        Пока каждый плагин возвращает тот же объект списка (свой кэш),
+        возвращается один и тот же кортеж, поэтому по его идентичности
+        можно кэшировать производные данные (например, сериализованный ответ).
+
+        Returns:
+            Tuple[ApplicationInfo, ...]: Обнаруженные приложения
+        """
+        with self._refresh_lock:
+            results = tuple(self._run_discoverer(d) for d in self.discoverers)
+
+            snapshot = self._snapshot
+            if (
+                snapshot is not None
+                and len(snapshot[0]) == len(results)
+                and all(new is old for new, old in zip(results, snapshot[0]))
+            ):
+                return snapshot[1]
+
+            apps = tuple(app for plugin_apps in results for app in plugin_apps)
+            self._snapshot = (results, apps)
+            return apps
+
+    def _run_discoverer(self, discoverer: AbstractDiscoverer) -> List[ApplicationInfo]:
+        """Запускает обнаружение на одном плагине."""
+        try:
+            return discoverer.discover()
+        except Exception as e:
+            logger.info(f"Error running discoverer {type(discoverer).__name__}: {e}")
+            return []
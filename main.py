@@ -7,7 +7,7 @@ import threading
 from typing import Optional
 
 from discovery import DiscoveryManager
-from server import run_server
+from server import run_server, refresh_network_identity
 from config import Config
 
 def setup_logging() -> None:
@@ -90,9 +90,16 @@ def setup_signal_handlers() -> None:
         logger.info("The agent has been stopped successfully.")
         sys.exit(0)
 
-    # Регистрируем только SIGTERM, SIGINT будет обработан через KeyboardInterrupt
+    # SIGINT будет обработан через KeyboardInterrupt
     signal.signal(signal.SIGTERM, signal_handler)
 
+    def sighup_handler(*_):
+        """Обработчик сигнала SIGHUP: перечитать имя и IP хоста"""
+        logger.info("Received SIGHUP, refreshing hostname and IP address")
+        refresh_network_identity()
+
+    signal.signal(signal.SIGHUP, sighup_handler)
+
     logger.debug("Signal handlers are registered")    
 
 def main():
@@ -129,7 +136,11 @@ def main():
         logger.info("=" * 60)
 
         try:
-            httpd_instance = run_server(discovery_manager)
+            if Config.USE_ASYNC:
+                from server_async import run_server_async
+                httpd_instance = run_server_async(discovery_manager)
+            else:
+                httpd_instance = run_server(discovery_manager)
             httpd_instance.serve_forever()
 
         except OSError as e:
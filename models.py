@@ -2,9 +2,14 @@
 from dataclasses import dataclass, field
 from typing import Dict, Any
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ApplicationInfo:
-    """Универсальная модель для информации о приложении."""
+    """
+    Универсальная модель для информации о приложении.
+
+    Объект не изменяется после обнаружения: кэши результатов
+    discover() отдают одни и те же экземпляры разным запросам.
+    """
     name: str
     version: str
     status: str
@@ -1,11 +1,20 @@
 # plugins/haproxy_client.py
+import csv
+import sys
+import time
 import socket
 import logging
-from typing import List, Dict, Optional, Any, Tuple, Union
+import threading
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import List, Dict, Optional, Any, Tuple, Union, Iterator
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Разобранная CSV статистика: ({имя_колонки: индекс}, [строки значений])
+StatTable = Tuple[Dict[str, int], List[Tuple[bytes, ...]]]
+
 
 class HAProxyConnectionError(Exception):
     """Ошибка подключения к HAProxy."""
@@ -17,6 +26,59 @@ class HAProxyCommandError(Exception):
     pass
 
 
+class ServerInfo:
+    """
+    Информация о сервере бэкенда HAProxy.
+
+    Компактная запись с __slots__ вместо словаря на каждый сервер.
+    Для сериализации в JSON используется as_dict().
+    """
+
+    __slots__ = (
+        'name', 'status', 'weight', 'check_status', 'check_duration',
+        'last_chg', 'downtime', 'addr', 'cookie',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        status: str,
+        weight: str,
+        check_status: str,
+        check_duration: str,
+        last_chg: str,
+        downtime: str,
+        addr: str,
+        cookie: str
+    ):
+        self.name = name
+        self.status = status
+        self.weight = weight
+        self.check_status = check_status
+        self.check_duration = check_duration
+        self.last_chg = last_chg
+        self.downtime = downtime
+        self.addr = addr
+        self.cookie = cookie
+
+    def as_dict(self) -> Dict[str, str]:
+        """Сериализует объект в словарь."""
+        return {
+            'name': self.name,
+            'status': self.status,
+            'weight': self.weight,
+            'check_status': self.check_status,
+            'check_duration': self.check_duration,
+            'last_chg': self.last_chg,
+            'downtime': self.downtime,
+            'addr': self.addr,
+            'cookie': self.cookie,
+        }
+
+    def __repr__(self) -> str:
+        return f"ServerInfo({self.as_dict()})"
+
+
 class HAProxyClient:
     """
     Клиент для взаимодействия с HAProxy через Unix Socket или TCP Socket.
@@ -34,6 +96,33 @@ class HAProxyClient:
     # Таймаут по умолчанию (секунды)
     DEFAULT_TIMEOUT = 5.0
 
+    # Начальный размер буфера приема ответа (байты)
+    RECV_BUFFER_SIZE = 65536
+
+    # Пул буферов приема: сколько свободных буферов хранится и до какого
+    # размера (байты) выросший буфер возвращается в пул
+    RECV_BUFFER_POOL_SIZE = 8
+    RECV_BUFFER_MAX_POOLED = 1048576
+
+    # Размер приемного буфера ядра для TCP сокета (байты)
+    TCP_RCVBUF_SIZE = 262144
+
+    # Приглашение командной строки HAProxy в интерактивном режиме
+    _PROMPT = b"\n> "
+
+    # Битовая маска типа объекта для фильтра "show stat <iid> <type> <sid>"
+    STAT_TYPE_SERVER = 4
+
+    # Колонки CSV статистики с полями сервера, в порядке аргументов ServerInfo
+    SERVER_COLUMNS = (
+        'svname', 'status', 'weight', 'check_status', 'check_duration',
+        'last_chg', 'downtime', 'addr', 'cookie',
+    )
+
+    # Индексы колонок по строке заголовков. Схема CSV у HAProxy фиксирована,
+    # поэтому имена колонок интернируются и индекс строится один раз
+    _header_indexes: Dict[Tuple[str, ...], Dict[str, int]] = {}
+
     def __init__(self, socket_path: str, timeout: float = DEFAULT_TIMEOUT):
         """
         Инициализация клиента HAProxy.
@@ -48,6 +137,15 @@ class HAProxyClient:
         self.socket_path_str = socket_path
         self.timeout = timeout
 
+        # Кэш идентификаторов для фильтрованных запросов статистики:
+        # {backend: iid} и {(backend, server): sid}
+        self._backend_ids: Dict[str, int] = {}
+        self._server_ids: Dict[Tuple[str, str], int] = {}
+
+        # Свободные буферы приема ответа, общие для всех потоков
+        self._recv_buffers: List[bytearray] = []
+        self._recv_buffers_lock = threading.Lock()
+
         # Определяем тип socket и парсим адрес
         self.socket_type, self.address = self._parse_socket_path(socket_path)
 
@@ -128,15 +226,20 @@ class HAProxyClient:
         else:
             raise HAProxyConnectionError(f"Unknown socket type: {self.socket_type}")
 
-    def _send_command(self, command: str) -> str:
+    @contextmanager
+    def _open_command(self, command: str) -> Iterator[socket.socket]:
         """
-        Отправляет команду в HAProxy через Unix Socket или TCP Socket.
+        Подключается к HAProxy через Unix Socket или TCP Socket и отправляет команду.
+
+        Возвращает подключенный сокет для чтения ответа; сокет закрывается
+        при выходе из контекста. Ошибки сокета, возникшие как при отправке,
+        так и при чтении ответа, преобразуются в исключения клиента.
 
         Args:
             command: Команда для выполнения
 
-        Returns:
-            str: Ответ от HAProxy
+        Yields:
+            socket.socket: Сокет, из которого читается ответ
 
         Raises:
             HAProxyConnectionError: Ошибка подключения
@@ -153,6 +256,11 @@ class HAProxyClient:
 
             elif self.socket_type == 'tcp4':
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                # Команда - одна короткая строка: отключаем алгоритм Нейгла,
+                # чтобы она ушла сразу, а большой приемный буфер позволяет
+                # забирать объемный вывод "show stat" меньшим числом чтений
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.TCP_RCVBUF_SIZE)
                 connect_address = self.address  # (host, port) tuple
                 logger.debug(f"Создан IPv4 socket, адрес: {connect_address}")
 
@@ -170,18 +278,7 @@ class HAProxyClient:
                 sock.sendall(f"{command}\n".encode('utf-8'))
                 logger.debug(f"Команда отправлена")
 
-                # Получаем ответ
-                response = b""
-                while True:
-                    chunk = sock.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-
-                result = response.decode('utf-8')
-                logger.debug(f"Получен ответ от HAProxy ({len(result)} байт)")
-
-                return result
+                yield sock
 
             finally:
                 sock.close()
@@ -202,44 +299,199 @@ class HAProxyClient:
             logger.error(error_msg, exc_info=True)
             raise HAProxyCommandError(error_msg)
 
-    def _parse_csv_response(self, response: str) -> List[Dict[str, str]]:
+    def _send_command(self, command: str) -> str:
+        """
+        Отправляет команду в HAProxy и возвращает ответ целиком.
+
+        Args:
+            command: Команда для выполнения
+
+        Returns:
+            str: Ответ от HAProxy
+
+        Raises:
+            HAProxyConnectionError: Ошибка подключения
+            HAProxyCommandError: Ошибка выполнения команды
+        """
+        return self._send_command_raw(command).decode('utf-8')
+
+    def _send_command_raw(self, command: str) -> bytes:
+        """
+        Отправляет команду в HAProxy и возвращает ответ без декодирования.
+
+        Args:
+            command: Команда для выполнения
+
+        Returns:
+            bytes: Ответ от HAProxy
+
+        Raises:
+            HAProxyConnectionError: Ошибка подключения
+            HAProxyCommandError: Ошибка выполнения команды
+        """
+        with self._open_command(command) as sock:
+            # Получаем ответ в буфер из пула без копирования уже принятых
+            # данных; при заполнении буфер растет вдвое и возвращается
+            # в пул для следующих команд
+            buf = self._acquire_recv_buffer()
+            view = memoryview(buf)
+            try:
+                offset = 0
+                prompt_len = len(self._PROMPT)
+
+                # Время чтения ответа ограничено таймаутом целиком, а не каждым
+                # recv. Чтение заканчивается, когда HAProxy закрывает соединение
+                # или (в интерактивном режиме) присылает приглашение "> "
+                deadline = time.monotonic() + self.timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise socket.timeout("timed out waiting for HAProxy response")
+
+                    # Таймаут сокета вместо select: select не работает
+                    # с дескрипторами >= FD_SETSIZE
+                    sock.settimeout(remaining)
+                    received = sock.recv_into(view[offset:])
+                    if not received:
+                        break
+                    offset += received
+
+                    if offset >= prompt_len and view[offset - prompt_len:offset] == self._PROMPT:
+                        # Убираем приглашение, оставляя завершающий перевод строки
+                        offset -= prompt_len - 1
+                        break
+
+                    if offset == len(buf):
+                        view.release()
+                        buf.extend(bytes(len(buf)))
+                        view = memoryview(buf)
+
+                result = view[:offset].tobytes()
+            finally:
+                view.release()
+                self._release_recv_buffer(buf)
+
+        logger.debug(f"Получен ответ от HAProxy ({len(result)} байт)")
+        return result
+
+    def _acquire_recv_buffer(self) -> bytearray:
+        """
+        Берет свободный буфер приема ответа из пула.
+
+        Если свободных буферов нет (все заняты параллельными командами),
+        создается новый буфер RECV_BUFFER_SIZE.
+
+        Returns:
+            bytearray: Буфер приема
+        """
+        with self._recv_buffers_lock:
+            if self._recv_buffers:
+                return self._recv_buffers.pop()
+        return bytearray(self.RECV_BUFFER_SIZE)
+
+    def _release_recv_buffer(self, buf: bytearray) -> None:
+        """
+        Возвращает буфер приема в пул.
+
+        Буфер больше RECV_BUFFER_MAX_POOLED или сверх RECV_BUFFER_POOL_SIZE
+        свободных не сохраняется, чтобы разовый большой ответ не удерживал
+        память.
+
+        Args:
+            buf: Буфер, полученный из _acquire_recv_buffer()
+        """
+        if len(buf) > self.RECV_BUFFER_MAX_POOLED:
+            return
+        with self._recv_buffers_lock:
+            if len(self._recv_buffers) < self.RECV_BUFFER_POOL_SIZE:
+                self._recv_buffers.append(buf)
+
+    def _query_stat(self, command: str) -> StatTable:
+        """
+        Выполняет команду, возвращающую CSV статистику, и разбирает ответ.
+
+        Args:
+            command: Команда для выполнения (например, "show stat")
+
+        Returns:
+            StatTable: Индекс колонок и список строк значений
+
+        Raises:
+            HAProxyConnectionError: Ошибка подключения
+            HAProxyCommandError: Ошибка выполнения команды
+        """
+        return self._parse_csv_response(self._send_command_raw(command))
+
+    def _parse_csv_response(self, response: bytes) -> StatTable:
         """
         Парсит CSV ответ от HAProxy.
 
+        Ответ разбивается на строки и поля на уровне байтов, без
+        декодирования целиком: значения остаются bytes и декодируются
+        только для тех полей, которые действительно используются.
+        Декодируются лишь заголовки (один раз на ответ).
+
         Args:
             response: CSV ответ от HAProxy
 
         Returns:
-            List[Dict[str, str]]: Список словарей с данными
+            StatTable: Индекс колонок и список строк значений (bytes)
         """
-        lines = response.strip().split('\n')
-        if not lines:
-            return []
+        lines = response.split(b'\n')
 
         # Первая строка - заголовки (начинается с '# ')
         header_line = lines[0]
-        if not header_line.startswith('#'):
+        if not header_line.strip():
+            return {}, []
+
+        if not header_line.startswith(b'#'):
             logger.warning("CSV ответ не содержит заголовков")
-            return []
+            return {}, []
 
-        # Убираем '# ' и разбиваем по запятым
-        headers = [h.strip() for h in header_line[2:].split(',')]
+        # Поля CSV у HAProxy не дополняются пробелами, поэтому значения
+        # не обрезаются поштучно: убираем только префикс '# ' заголовков
+        # и '\r' в конце строк (если ответ пришел с CRLF)
+        headers = tuple(h.decode('utf-8') for h in header_line[1:].lstrip().rstrip(b'\r').split(b','))
+        header_index = self._get_header_index(headers)
+        columns = len(headers)
 
-        result = []
+        rows = []
         for line in lines[1:]:
-            if not line or line.startswith('#'):
+            line = line.rstrip(b'\r')
+            if not line or line.startswith(b'#'):
                 continue
 
-            values = [v.strip() for v in line.split(',')]
+            row = line.split(b',')
+            if len(row) != columns and b'"' in line:
+                # Значение в кавычках содержит запятую (например, описание
+                # проверки) - такую редкую строку разбираем модулем csv
+                row = [v.encode('utf-8') for v in next(csv.reader([line.decode('utf-8')]))]
 
             # Проверяем соответствие количества значений и заголовков
-            if len(values) != len(headers):
-                logger.warning(f"Пропуск строки с несоответствующим количеством полей: {line[:50]}...")
+            if len(row) != columns:
+                logger.warning(f"Пропуск строки с несоответствующим количеством полей: {line[:50]!r}...")
                 continue
 
-            result.append(dict(zip(headers, values)))
+            rows.append(tuple(row))
 
-        return result
+        return header_index, rows
+
+    @classmethod
+    def _get_header_index(cls, headers: Tuple[str, ...]) -> Dict[str, int]:
+        """
+        Возвращает индекс {имя_колонки: позиция} для строки заголовков.
+
+        Args:
+            headers: Имена колонок в порядке следования
+
+        Returns:
+            Dict[str, int]: Индекс колонок
+        """
+        header_index = cls._header_indexes.get(headers)
+        if header_index is None:
+            header_index = {sys.intern(h): i for i, h in enumerate(headers)}
+            cls._header_indexes[headers] = header_index
+        return header_index
 
     def get_info(self) -> Dict[str, str]:
         """
@@ -276,19 +528,18 @@ class HAProxyClient:
         logger.info("Получение списка бэкендов")
 
         try:
-            response = self._send_command("show stat")
-            stats = self._parse_csv_response(response)
+            response = self._send_command_raw("show stat")
 
-            # Извлекаем уникальные имена бэкендов
+            # Извлекаем уникальные имена бэкендов прямо из байтов ответа,
+            # не разбирая строки целиком
             # В HAProxy stat: pxname - имя proxy (frontend/backend)
             # svname - имя сервера или BACKEND/FRONTEND
             backends = set()
-            for entry in stats:
-                pxname = entry.get('pxname', '')
-                svname = entry.get('svname', '')
+            for line in response.split(b'\n'):
                 # Ищем записи типа BACKEND (это маркер бэкенда)
-                if svname == 'BACKEND':
-                    backends.add(pxname)
+                pxname, _, rest = line.partition(b',')
+                if rest.startswith(b'BACKEND,') and not pxname.startswith(b'#'):
+                    backends.add(pxname.decode('utf-8'))
 
             result = sorted(list(backends))
             logger.info(f"Найдено бэкендов: {len(result)}")
@@ -300,39 +551,42 @@ class HAProxyClient:
             logger.error(f"Ошибка получения списка бэкендов: {e}")
             raise
 
-    def get_backend_servers(self, backend_name: str) -> List[Dict[str, str]]:
+    def get_backend_servers(self, backend_name: str) -> List[ServerInfo]:
         """
         Получает информацию о всех серверах в указанном бэкенде.
 
+        Запрашивает у HAProxy только строки серверов нужного бэкенда
+        ("show stat <iid> 4 -1"). Неизвестный iid определяется компактной
+        командой "show servers state <backend>". Полная статистика
+        запрашивается, только если это не удалось или фильтрованный ответ пуст.
+
         Args:
             backend_name: Имя бэкенда
 
         Returns:
-            List[Dict[str, str]]: Список серверов с их параметрами
+            List[ServerInfo]: Список серверов с их параметрами
         """
         logger.info(f"Получение серверов для бэкенда: {backend_name}")
 
         try:
-            response = self._send_command("show stat")
-            stats = self._parse_csv_response(response)
-
-            # Фильтруем серверы нужного бэкенда
             servers = []
-            for entry in stats:
-                if entry.get('pxname', '') == backend_name and entry.get('svname', '') not in ['BACKEND', 'FRONTEND']:
-                    # Оставляем только полезные поля
-                    server_info = {
-                        'name': entry.get('svname', ''),
-                        'status': entry.get('status', ''),
-                        'weight': entry.get('weight', ''),
-                        'check_status': entry.get('check_status', ''),
-                        'check_duration': entry.get('check_duration', ''),
-                        'last_chg': entry.get('last_chg', ''),
-                        'downtime': entry.get('downtime', ''),
-                        'addr': entry.get('addr', ''),
-                        'cookie': entry.get('cookie', ''),
-                    }
-                    servers.append(server_info)
+
+            iid = self._backend_ids.get(backend_name)
+            if iid is None and self._remember_ids_from_servers_state(backend_name):
+                iid = self._backend_ids.get(backend_name)
+
+            if iid is not None:
+                stats = self._query_stat(f"show stat {iid} {self.STAT_TYPE_SERVER} -1")
+                servers = self._collect_servers(stats, backend_name)
+
+            if not servers:
+                # iid не удалось определить или он устарел после перезагрузки
+                # HAProxy - берем полную статистику и заодно обновляем кэш
+                # идентификаторов
+                self._backend_ids.pop(backend_name, None)
+                stats = self._query_stat("show stat")
+                self._remember_ids(stats)
+                servers = self._collect_servers(stats, backend_name)
 
             logger.info(f"Найдено серверов в бэкенде '{backend_name}': {len(servers)}")
             return servers
@@ -341,6 +595,121 @@ class HAProxyClient:
             logger.error(f"Ошибка получения серверов для бэкенда '{backend_name}': {e}")
             raise
 
+    def _remember_ids_from_servers_state(self, backend_name: str) -> bool:
+        """
+        Запоминает iid бэкенда и sid его серверов по выводу
+        "show servers state <backend>" (HAProxy 1.6+).
+
+        Ответ содержит только серверы одного бэкенда и несколько колонок,
+        поэтому он намного меньше полной CSV статистики.
+
+        Формат ответа:
+            1
+            # be_id be_name srv_id srv_name srv_addr ...
+            3 bk_app 1 srv1 10.0.0.1 ...
+
+        Args:
+            backend_name: Имя бэкенда
+
+        Returns:
+            bool: True если iid бэкенда найден
+        """
+        try:
+            response = self._send_command(f"show servers state {backend_name}")
+        except HAProxyCommandError:
+            return False
+
+        lines = response.splitlines()
+        # Первая строка - версия формата, вторая - заголовки
+        if len(lines) < 2 or not lines[0].strip().isdigit() or not lines[1].startswith('#'):
+            logger.debug(f"Неожиданный формат show servers state для '{backend_name}'")
+            return False
+
+        columns = lines[1][1:].split()
+        try:
+            be_id_idx = columns.index('be_id')
+            be_name_idx = columns.index('be_name')
+            srv_id_idx = columns.index('srv_id')
+            srv_name_idx = columns.index('srv_name')
+        except ValueError:
+            logger.debug(f"Неожиданный формат show servers state для '{backend_name}'")
+            return False
+
+        min_fields = max(be_id_idx, be_name_idx, srv_id_idx, srv_name_idx) + 1
+        for line in lines[2:]:
+            parts = line.split()
+            if len(parts) < min_fields or parts[be_name_idx] != backend_name:
+                continue
+            try:
+                self._backend_ids[backend_name] = int(parts[be_id_idx])
+                self._server_ids[(backend_name, parts[srv_name_idx])] = int(parts[srv_id_idx])
+            except ValueError:
+                continue
+
+        return backend_name in self._backend_ids
+
+    def _remember_ids(self, stats: StatTable) -> None:
+        """
+        Запоминает iid бэкендов и sid серверов из строк статистики.
+
+        Args:
+            stats: Разобранная статистика HAProxy
+        """
+        header_index, rows = stats
+        if not rows:
+            return
+
+        pxname_idx = header_index['pxname']
+        svname_idx = header_index['svname']
+        iid_idx = header_index['iid']
+        sid_idx = header_index['sid']
+        for row in rows:
+            svname = row[svname_idx]
+            try:
+                if svname == b'BACKEND':
+                    self._backend_ids[row[pxname_idx].decode('utf-8')] = int(row[iid_idx])
+                elif svname != b'FRONTEND':
+                    key = (row[pxname_idx].decode('utf-8'), svname.decode('utf-8'))
+                    self._server_ids[key] = int(row[sid_idx])
+            except ValueError:
+                continue
+
+    def _collect_servers(self, stats: StatTable, backend_name: str) -> List[ServerInfo]:
+        """
+        Отбирает серверы указанного бэкенда из строк статистики.
+
+        Args:
+            stats: Разобранная статистика HAProxy
+            backend_name: Имя бэкенда
+
+        Returns:
+            List[ServerInfo]: Список серверов с их параметрами
+        """
+        header_index, rows = stats
+        if not rows:
+            return []
+
+        pxname_idx = header_index['pxname']
+        svname_idx = header_index['svname']
+        # Оставляем только полезные поля: все они извлекаются из строки
+        # одним вызовом itemgetter (отсутствующие колонки - пустая строка)
+        columns = [header_index.get(column) for column in self.SERVER_COLUMNS]
+        if None in columns:
+            def extract(row: Tuple[bytes, ...]) -> Tuple[bytes, ...]:
+                return tuple(row[idx] if idx is not None else b'' for idx in columns)
+        else:
+            extract = itemgetter(*columns)
+
+        # Строки фильтруются по байтам; декодируются только поля
+        # отобранных серверов
+        backend = backend_name.encode('utf-8')
+        servers = []
+        for row in rows:
+            if row[pxname_idx] == backend and row[svname_idx] not in (b'BACKEND', b'FRONTEND'):
+                servers.append(ServerInfo(*[value.decode('utf-8') for value in extract(row)]))
+
+        return servers
+
     def set_server_state(self, backend_name: str, server_name: str, state: str) -> bool:
         """
         Устанавливает состояние сервера.
@@ -369,13 +738,7 @@ class HAProxyClient:
         try:
             command = f"set server {backend_name}/{server_name} state {state}"
             response = self._send_command(command)
-
-            # HAProxy возвращает пустой ответ при успехе или сообщение об ошибке
-            if response.strip():
-                # Если есть ответ, проверяем на ошибки
-                if 'error' in response.lower() or 'invalid' in response.lower():
-                    logger.error(f"HAProxy вернул ошибку: {response}")
-                    raise HAProxyCommandError(f"HAProxy error: {response}")
+            self._check_set_response(response)
 
             logger.info(f"Состояние сервера {backend_name}/{server_name} успешно изменено на '{state}'")
             return True
@@ -387,7 +750,126 @@ class HAProxyClient:
             logger.error(error_msg)
             raise HAProxyCommandError(error_msg)
 
-    def get_server_state(self, backend_name: str, server_name: str) -> Optional[Dict[str, str]]:
+    def set_and_get_server_state(
+        self,
+        backend_name: str,
+        server_name: str,
+        state: str
+    ) -> Optional[ServerInfo]:
+        """
+        Устанавливает состояние сервера и сразу возвращает его новую статистику.
+
+        Если iid бэкенда и sid сервера уже известны, обе команды
+        ("set server ..." и "show stat <iid> 4 <sid>") отправляются
+        через ';' в одном соединении, и HAProxy выполняет их последовательно.
+        Иначе выполняются set_server_state() и get_server_state().
+
+        Args:
+            backend_name: Имя бэкенда
+            server_name: Имя сервера
+            state: Новое состояние ('ready', 'drain', 'maint')
+
+        Returns:
+            Optional[ServerInfo]: Информация о сервере после изменения
+                                      или None если сервер не найден
+                                      или состояние не удалось прочитать
+
+        Raises:
+            ValueError: Если state невалидный
+            HAProxyCommandError: Если команда не выполнена
+        """
+        iid = self._backend_ids.get(backend_name)
+        sid = self._server_ids.get((backend_name, server_name))
+        if iid is None or sid is None or state not in self.VALID_STATES:
+            self.set_server_state(backend_name, server_name, state)
+            return self._get_server_state_after_set(backend_name, server_name)
+
+        logger.info(f"Установка состояния сервера: {backend_name}/{server_name} -> {state}")
+
+        try:
+            command = (
+                f"set server {backend_name}/{server_name} state {state}; "
+                f"show stat {iid} {self.STAT_TYPE_SERVER} {sid}"
+            )
+            response = self._send_command_raw(command)
+
+            # Вывод каждой команды завершается пустой строкой;
+            # успешный "set server" ничего не выводит
+            if response.startswith(b'\n'):
+                set_response, stat_response = b'', response[1:]
+            else:
+                set_response, _, stat_response = response.partition(b'\n\n')
+            self._check_set_response(set_response.decode('utf-8'))
+
+        except HAProxyCommandError:
+            raise
+        except Exception as e:
+            error_msg = f"Failed to set server state {backend_name}/{server_name}: {e}"
+            logger.error(error_msg)
+            raise HAProxyCommandError(error_msg)
+
+        logger.info(f"Состояние сервера {backend_name}/{server_name} успешно изменено на '{state}'")
+
+        try:
+            stats = self._parse_csv_response(stat_response)
+            for server in self._collect_servers(stats, backend_name):
+                if server.name == server_name:
+                    return server
+        except Exception as e:
+            logger.warning(
+                f"Состояние {backend_name}/{server_name} изменено, "
+                f"но ответ show stat не разобран: {e}"
+            )
+            return None
+
+        # Идентификаторы устарели (например, после перезагрузки HAProxy)
+        return self._get_server_state_after_set(backend_name, server_name)
+
+    def _get_server_state_after_set(
+        self,
+        backend_name: str,
+        server_name: str
+    ) -> Optional[ServerInfo]:
+        """
+        Чтение состояния сервера после успешного "set server".
+
+        Состояние уже изменено, поэтому ошибка чтения не превращается
+        в ошибку действия: она логируется, и возвращается None.
+
+        Args:
+            backend_name: Имя бэкенда
+            server_name: Имя сервера
+
+        Returns:
+            Optional[ServerInfo]: Информация о сервере или None
+        """
+        try:
+            return self.get_server_state(backend_name, server_name)
+        except Exception as e:
+            logger.warning(
+                f"Состояние {backend_name}/{server_name} изменено, "
+                f"но не удалось его прочитать: {e}"
+            )
+            return None
+
+    def _check_set_response(self, response: str) -> None:
+        """
+        Проверяет ответ HAProxy на команду "set server".
+
+        Args:
+            response: Ответ HAProxy
+
+        Raises:
+            HAProxyCommandError: Если HAProxy вернул ошибку
+        """
+        # HAProxy возвращает пустой ответ при успехе или сообщение об ошибке
+        if response.strip():
+            # Если есть ответ, проверяем на ошибки
+            if 'error' in response.lower() or 'invalid' in response.lower():
+                logger.error(f"HAProxy вернул ошибку: {response}")
+                raise HAProxyCommandError(f"HAProxy error: {response}")
+
+    def get_server_state(self, backend_name: str, server_name: str) -> Optional[ServerInfo]:
         """
         Получает информацию о конкретном сервере.
 
@@ -396,15 +878,25 @@ class HAProxyClient:
             server_name: Имя сервера
 
         Returns:
-            Optional[Dict[str, str]]: Информация о сервере или None если не найден
+            Optional[ServerInfo]: Информация о сервере или None если не найден
         """
         logger.info(f"Получение состояния сервера: {backend_name}/{server_name}")
 
         try:
+            # Известны iid и sid - запрашиваем строку только этого сервера
+            iid = self._backend_ids.get(backend_name)
+            sid = self._server_ids.get((backend_name, server_name))
+            if iid is not None and sid is not None:
+                stats = self._query_stat(f"show stat {iid} {self.STAT_TYPE_SERVER} {sid}")
+                for server in self._collect_servers(stats, backend_name):
+                    if server.name == server_name:
+                        logger.debug(f"Сервер найден: {server}")
+                        return server
+
             servers = self.get_backend_servers(backend_name)
 
             for server in servers:
-                if server.get('name', '') == server_name:
+                if server.name == server_name:
                     logger.debug(f"Сервер найден: {server}")
                     return server
 
@@ -419,12 +911,14 @@ class HAProxyClient:
         """
         Проверяет доступность HAProxy.
 
+        Ищет поле Version прямо в байтах ответа "show info", не разбирая
+        остальные строки.
+
         Returns:
             bool: True если HAProxy доступен
         """
         try:
-            info = self.get_info()
-            return 'Version' in info
+            return b"Version:" in self._send_command_raw("show info")
         except Exception as e:
             logger.warning(f"Health check failed: {e}")
             return False
@@ -1,10 +1,19 @@
 # plugins/svc_app_discoverer.py
+import os
 import re
+import stat
 import subprocess
+import sys
 import logging
 import json
+import mmap
+import time
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, BinaryIO, Union
 
 from discovery import AbstractDiscoverer
 from models import ApplicationInfo
@@ -12,11 +21,118 @@ from config import Config
 
 logger = logging.getLogger(__name__)
 
+# google-re2 (если установлен) сопоставляет за линейное время;
+# синтаксис используемых шаблонов совместим с модулем re
+try:
+    import re2 as regex_engine
+except ImportError:
+    regex_engine = re
+
+# lxml (если установлен) разбирает server.xml потоком в libxml2;
+# без него используется xml.etree.ElementTree
+try:
+    from lxml import etree as lxml_etree
+    XML_PARSE_ERRORS: Tuple[type, ...] = (lxml_etree.XMLSyntaxError, ET.ParseError)
+except ImportError:
+    lxml_etree = None
+    XML_PARSE_ERRORS = (ET.ParseError,)
+
+
+def _link_target(link: Union[Path, str]) -> str:
+    """
+    Получение цели симлинка одним вызовом readlink.
+
+    В отличие от Path.resolve() не проходит весь путь по компонентам:
+    относительная цель дополняется директорией симлинка и нормализуется.
+    Цель с ".." разрешается через realpath: лексическая нормализация
+    ошибается, если директория симлинка сама находится за симлинком.
+    Результат не зависит от текущей директории процесса.
+
+    Args:
+        link: Путь к симлинку
+
+    Returns:
+        str: Абсолютный путь цели или "Unknown", если путь не является симлинком
+    """
+    try:
+        target = os.readlink(link)
+    except OSError:
+        return "Unknown"
+    if os.path.isabs(target):
+        return os.path.normpath(target)
+    if '..' in target.split(os.sep):
+        return os.path.realpath(link)
+    return os.path.normpath(os.path.join(os.path.dirname(link), target))
+
+
+
+@lru_cache(maxsize=8)
+def _load_mapping_cached(path: str, mtime: float) -> Dict[str, str]:
+    """
+    Разбор файла маппинга имен приложений.
+
+    Результат кэшируется по паре (путь, mtime): повторное создание
+    плагина не перечитывает файл, пока он не изменится. Возвращаемый
+    словарь общий для всех вызовов и не должен изменяться.
+
+    Args:
+        path: Путь к файлу маппинга
+        mtime: Время модификации файла (ключ кэша)
+
+    Returns:
+        Dict[str, str]: Словарь маппинга имен или пустой словарь
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            mapping = json.load(f)
+
+        if not isinstance(mapping, dict):
+            logger.warning(f"Некорректный формат файла маппинга: ожидается словарь")
+            return {}
+
+        logger.info(f"Загружен маппинг из {path}: {mapping}")
+        return mapping
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Ошибка парсинга JSON в {path}: {e}")
+    except Exception as e:
+        logger.error(f"Ошибка при загрузке маппинга из {path}: {e}")
+
+    return {}
+
+
 class SVCAppDiscoverer(AbstractDiscoverer):
     """Плагин для обнаружения приложений, управляемых через svc (Solaris)."""
 
     ARTIFACT_CHECK_ORDER = ['war', 'jar', 'dir']
 
+    # Состояния SMF, в которых у сервиса нет процессов: PID и сокеты
+    # не ищутся. Остальные состояния (в том числе unknown, если svcs
+    # недоступен) обрабатываются полностью
+    STOPPED_STATES = ('disabled', 'maintenance', 'offline')
+
+    # Время жизни снимка слушающих сокетов netstat (секунды)
+    NETSTAT_CACHE_TTL = 2.0
+
+    # Типичные порты Java приложений в порядке предпочтения
+    _COMMON_PORTS: Tuple[int, ...] = Config.COMMON_APP_PORTS
+
+    # На Linux сокеты читаются из /proc/net вместо запуска netstat
+    USE_PROCFS = sys.platform.startswith('linux')
+
+    # Таблицы TCP сокетов в /proc/net и состояние LISTEN в них
+    _PROC_NET_TCP = ('tcp', 'tcp6')
+    _PROC_TCP_LISTEN = '0A'
+
+    # Loopback адреса в шестнадцатеричном виде /proc/net/tcp[6]
+    # (127.0.0.1 и ::1 в порядке байт хоста little-endian)
+    _PROC_LOOPBACK_ADDRS = ('0100007F', '00000000000000000000000001000000')
+
+    # Поиск HTTP Connector в server.xml, который не удалось разобрать как XML
+    _HTTP_CONNECTOR_RE = regex_engine.compile(
+        rb'(?i)<Connector[^>]*port=["\'](\d+)["\'][^>]*protocol=["\']HTTP'
+    )
+
     def __init__(self):
         """Инициализация плагина с проверкой конфигурации"""
         super().__init__()
@@ -30,9 +146,37 @@ class SVCAppDiscoverer(AbstractDiscoverer):
             ['jar', 'war']
         )
 
+        # Суффиксы артефактов, отбрасываемые перед извлечением версии
+        self._artifact_suffixes = tuple(f".{ext}" for ext in self.supported_extensions)
+
+        # Множество расширений и порядок проверки артефактов без
+        # неподдерживаемых типов вычисляются один раз
+        self._supported_set = frozenset(self.supported_extensions)
+        self._checked_order = tuple(
+            artifact_type for artifact_type in self.ARTIFACT_CHECK_ORDER
+            if artifact_type == 'dir' or artifact_type in self._supported_set
+        )
+
         # Загружаем маппинг имен приложений
         self.name_mapping = self._load_name_mapping()
 
+        # Снимок слушающих сокетов netstat: (время, [(порт, pid, loopback)])
+        self._netstat_listeners: Optional[Tuple[float, List[Tuple[int, int, bool]]]] = None
+        self._netstat_lock = threading.Lock()
+        # Аргументы netstat; без -u, если он не поддерживается
+        self._netstat_args: Tuple[str, ...] = ("-anu",)
+
+        # Пул потоков создается один раз и переиспользуется всеми
+        # вызовами discover(); задачи пула не порождают новых задач
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(2, Config.SVC_DISCOVERY_WORKERS),
+            thread_name_prefix="svc-discovery"
+        )
+
+        # Кэш результата discover(): (время, mtime директорий, приложения)
+        self._cache: Optional[Tuple[float, Tuple[int, int], List[ApplicationInfo]]] = None
+        self._cache_lock = threading.Lock()
+
         logger.info(
             f"SVCAppDiscoverer инициализирован. "
             f"Поддерживаемые расширения: {', '.join(self.supported_extensions)}"
@@ -71,27 +215,13 @@ class SVCAppDiscoverer(AbstractDiscoverer):
             logger.debug("Путь к файлу маппинга не задан в конфигурации")
             return {}
 
-        if not mapping_file.exists():
+        try:
+            mtime = mapping_file.stat().st_mtime
+        except OSError:
             logger.debug(f"Файл маппинга не найден: {mapping_file}")
             return {}
 
-        try:
-            with open(mapping_file, 'r', encoding='utf-8') as f:
-                mapping = json.load(f)
-
-            if not isinstance(mapping, dict):
-                logger.warning(f"Некорректный формат файла маппинга: ожидается словарь")
-                return {}
-
-            logger.info(f"Загружен маппинг из {mapping_file}: {mapping}")
-            return mapping
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Ошибка парсинга JSON в {mapping_file}: {e}")
-        except Exception as e:
-            logger.error(f"Ошибка при загрузке маппинга из {mapping_file}: {e}")
-
-        return {}
+        return _load_mapping_cached(str(mapping_file), mtime)
     
     def _get_app_status(self, app_name: str) -> Tuple[str, str]:
         """
@@ -105,12 +235,12 @@ class SVCAppDiscoverer(AbstractDiscoverer):
         """
         try:
             result = subprocess.run(
-                ["svcs", "-Ho", "state,stime", app_name], 
-                capture_output=True, 
-                text=True,
+                ["svcs", "-Ho", "state,stime", app_name],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 timeout=10  # Таймаут для предотвращения зависания
             )
-            output = result.stdout.strip()
+            output = result.stdout.decode('ascii', 'replace').strip()
             if output:
                 parts = output.split(" ", 1)
                 state = parts[0]
@@ -130,6 +260,72 @@ class SVCAppDiscoverer(AbstractDiscoverer):
         
         return "unknown", "Unknown"
 
+    def _get_all_statuses(self, app_names: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Получение статусов всех приложений одним вызовом svcs.
+
+        Args:
+            app_names: Имена приложений (сервисов)
+
+        Returns:
+            Dict[str, Tuple[str, str]]: {имя_приложения: (статус, время_запуска)}
+        """
+        statuses: Dict[str, Tuple[str, str]] = {}
+        if not app_names:
+            return statuses
+
+        try:
+            # svcs печатает строки для всех найденных сервисов, даже если
+            # часть имен не найдена (об этом пишет в stderr)
+            result = subprocess.run(
+                ["svcs", "-Ho", "state,stime,fmri", *app_names],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=10
+            )
+
+            # Формат строки: STATE  STIME  FMRI
+            for line in result.stdout.decode('ascii', 'replace').splitlines():
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+
+                state = parts[0]
+                start_time = " ".join(parts[1:-1])
+                name = self._service_name(parts[-1])
+
+                # При нескольких инстансах берем первый, как и svcs для одного имени
+                statuses.setdefault(name, (state, start_time))
+
+            logger.debug(f"Получены статусы {len(statuses)} сервисов одним вызовом svcs")
+
+        except subprocess.TimeoutExpired:
+            logger.error("Таймаут при получении статусов сервисов")
+        except FileNotFoundError:
+            logger.error("Команда svcs не найдена.")
+        except Exception as e:
+            logger.error(f"Ошибка при получении статусов сервисов: {e}")
+
+        return statuses
+
+    @staticmethod
+    def _service_name(fmri: str) -> str:
+        """
+        Извлечение имени сервиса из FMRI.
+
+        Пример: svc:/site/myapp:default -> myapp
+
+        Args:
+            fmri: FMRI сервиса
+
+        Returns:
+            str: Последний компонент имени сервиса без инстанса
+        """
+        if fmri.startswith("svc:"):
+            fmri = fmri[4:]
+        service = fmri.rsplit(":", 1)[0] if ":" in fmri else fmri
+        return service.rsplit("/", 1)[-1]
+
     def _get_app_pid(self, app_name: str) -> Optional[int]:
         """
         Получение основного PID процесса приложения через svcs -p.
@@ -143,8 +339,8 @@ class SVCAppDiscoverer(AbstractDiscoverer):
         try:
             result = subprocess.run(
                 ["svcs", "-p", "-H", app_name],
-                capture_output=True,
-                text=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 timeout=10
             )
 
@@ -152,7 +348,7 @@ class SVCAppDiscoverer(AbstractDiscoverer):
                 # Парсим вывод svcs -p -H
                 # Формат: STATE  STIME  CTID  [PID PROCESS_NAME]
                 # Строки с PID начинаются с пробелов
-                lines = result.stdout.strip().split('\n')
+                lines = result.stdout.decode('ascii', 'replace').strip().splitlines()
 
                 for line in lines:
                     # Пропускаем строки заголовков (начинаются не с пробелов)
@@ -197,134 +393,397 @@ class SVCAppDiscoverer(AbstractDiscoverer):
 
         return None
 
-    def _parse_tomcat_server_xml(self, app_name: str) -> Optional[int]:
+    def _get_all_pids(self, app_names: List[str]) -> Dict[str, Optional[int]]:
+        """
+        Получение основных PID всех приложений одним вызовом svcs -p.
+
+        Args:
+            app_names: Имена приложений (сервисов)
+
+        Returns:
+            Dict[str, Optional[int]]: {имя_приложения: PID или None}.
+                                      Сервисы, которых нет в выводе svcs,
+                                      в словарь не попадают
+        """
+        pids: Dict[str, Optional[int]] = {}
+        if not app_names:
+            return pids
+
+        try:
+            # Код возврата не проверяем: если часть имен не найдена, svcs
+            # завершается с ошибкой, но выводит остальные сервисы
+            result = subprocess.run(
+                ["svcs", "-p", "-H", *app_names],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                timeout=10
+            )
+
+            # Формат вывода:
+            #   STATE  STIME  FMRI              <- строка сервиса
+            #                 STIME  PID NAME   <- процессы сервиса (с отступом)
+            current = None
+            for line in result.stdout.decode('ascii', 'replace').splitlines():
+                if not line.strip():
+                    continue
+
+                if not line[0].isspace():
+                    current = self._service_name(line.split()[-1])
+                    pids.setdefault(current, None)
+                    continue
+
+                # Берем первый PID сервиса, как и _get_app_pid()
+                if current is None or pids[current] is not None:
+                    continue
+                for part in line.split():
+                    try:
+                        pids[current] = int(part)
+                        break
+                    except ValueError:
+                        continue
+
+            logger.debug(f"Получены PID {len(pids)} сервисов одним вызовом svcs -p")
+
+        except subprocess.TimeoutExpired:
+            logger.error("Таймаут при получении PID сервисов")
+        except FileNotFoundError:
+            logger.error("Команда svcs не найдена.")
+        except Exception as e:
+            logger.error(f"Ошибка при получении PID сервисов: {e}")
+
+        return pids
+
+    def _parse_tomcat_server_xml(self, app_name: str, app_dir: Optional[str] = None) -> Optional[int]:
         """
         Парсинг server.xml для получения HTTP порта Tomcat.
 
         Args:
             app_name: Имя приложения
+            app_dir: Директория приложения в app_root
 
         Returns:
             Optional[int]: HTTP порт из server.xml или None
         """
+        if app_dir is None:
+            app_dir = str(self.app_root / app_name)
+
         # Путь к server.xml в структуре приложения
-        server_xml_path = self.app_root / app_name / "conf" / "server.xml"
+        server_xml_path = os.path.join(app_dir, "conf", "server.xml")
 
-        if not server_xml_path.exists():
+        if not os.path.exists(server_xml_path):
             logger.debug(f"{app_name}: server.xml не найден по пути {server_xml_path}")
             return None
 
         try:
-            with open(server_xml_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Читаем файл потоком событий парсера и останавливаемся на первом
+            # подходящем Connector; комментарии парсер пропускает сам
+            with open(server_xml_path, 'rb') as f:
+                port = self._find_http_connector_port(f)
+
+        except XML_PARSE_ERRORS as e:
+            # Некорректный XML - ищем Connector регулярным выражением
+            logger.debug(f"{app_name}: server.xml не разобран как XML ({e}), поиск по тексту")
+            try:
+                # Файл отображается в память: регулярное выражение
+                # применяется только к найденным тегам Connector
+                with open(server_xml_path, 'rb') as f:
+                    if os.fstat(f.fileno()).st_size == 0:
+                        port = None
+                    else:
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                            port = self._scan_connector_port(content)
+            except Exception as e:
+                logger.warning(f"{app_name}: ошибка при чтении server.xml: {e}")
+                return None
 
-            # Ищем HTTP Connector с портом
-            # <Connector port="8080" protocol="HTTP/1.1" .../>
-            # Игнорируем комментарии и AJP коннекторы
-            # Удаляем XML комментарии
-            content = re.sub(r'<!--.*?-->', '', content, flags=re.DOTALL)
+        except Exception as e:
+            logger.warning(f"{app_name}: ошибка при чтении server.xml: {e}")
+            return None
 
-            # Ищем HTTP/1.1 Connector (не AJP)
-            connector_pattern = r'<Connector[^>]*port=["\'](\d+)["\'][^>]*protocol=["\']HTTP'
-            match = re.search(connector_pattern, content, re.IGNORECASE)
+        if port is not None:
+            logger.debug(f"{app_name}: найден HTTP порт {port} в server.xml")
+        else:
+            logger.debug(f"{app_name}: HTTP Connector не найден в server.xml")
+        return port
 
-            if match:
-                port = int(match.group(1))
-                logger.debug(f"{app_name}: найден HTTP порт {port} в server.xml")
-                return port
-            else:
-                logger.debug(f"{app_name}: HTTP Connector не найден в server.xml")
+    @staticmethod
+    def _find_http_connector_port(source: BinaryIO) -> Optional[int]:
+        """
+        Поиск порта первого HTTP Connector в server.xml.
 
-        except Exception as e:
-            logger.warning(f"{app_name}: ошибка при чтении server.xml: {e}")
+        <Connector port="8080" protocol="HTTP/1.1" .../>
+        AJP коннекторы пропускаются; протокол по умолчанию у Tomcat - HTTP/1.1.
+        Порты, заданные не числом (например, ${port.http}), пропускаются.
+
+        Args:
+            source: Открытый в двоичном режиме server.xml
+
+        Returns:
+            Optional[int]: HTTP порт или None
+
+        Raises:
+            XML_PARSE_ERRORS: Если файл не является корректным XML
+        """
+        if lxml_etree is not None:
+            # libxml2 сам отбирает элементы Connector; внешние сущности
+            # и сеть при разборе не используются
+            events = lxml_etree.iterparse(
+                source,
+                events=('start',),
+                tag='Connector',
+                resolve_entities=False,
+                no_network=True
+            )
+        else:
+            events = ET.iterparse(source, events=('start',))
+
+        for _, element in events:
+            if not element.tag.endswith('Connector'):
+                continue
+
+            protocol = element.get('protocol', 'HTTP/1.1').upper()
+            port = element.get('port', '')
+            if 'AJP' not in protocol and port.isdigit():
+                return int(port)
 
         return None
 
-    def _get_listening_ports_netstat(self) -> Dict[int, int]:
+    @classmethod
+    def _scan_connector_port(cls, content: mmap.mmap) -> Optional[int]:
+        """
+        Поиск порта HTTP Connector в тексте server.xml без копирования файла.
+
+        Теги <Connector> находятся поиском подстроки; теги внутри
+        XML комментариев пропускаются. Незакрытый комментарий скрывает
+        остаток файла.
+
+        Args:
+            content: Содержимое server.xml, отображенное в память
+
+        Returns:
+            Optional[int]: HTTP порт или None
+        """
+        pos = 0
+        while True:
+            start = content.find(b'<Connector', pos)
+            if start < 0:
+                return None
+
+            comment = content.find(b'<!--', pos, start)
+            if comment >= 0:
+                comment_end = content.find(b'-->', comment + 4)
+                if comment_end < 0:
+                    return None
+                pos = comment_end + 3
+                continue
+
+            end = content.find(b'>', start)
+            if end < 0:
+                end = len(content) - 1
+
+            match = cls._HTTP_CONNECTOR_RE.match(content[start:end + 1])
+            if match:
+                return int(match.group(1))
+            pos = end + 1
+
+    def _get_listeners_netstat(self) -> List[Tuple[int, int, bool]]:
         """
-        Получение списка всех портов в состоянии LISTEN через netstat.
+        Получение всех сокетов в состоянии LISTEN одним вызовом netstat.
+
+        netstat -u (Solaris 11.2+) выводит PID процесса-владельца сокета,
+        поэтому один вызов на проход discover() заменяет опрос каждого
+        процесса. Если опция не поддерживается, используется netstat -an
+        без PID.
 
         Returns:
-            Dict[int, int]: Словарь {порт: pid} (pid может быть 0, если не удалось определить)
+            List[Tuple[int, int, bool]]: Список (порт, pid, адрес_loopback);
+                                         pid равен 0, если не удалось определить
         """
-        ports = {}
+        listeners = []
+        netstat_args = self._netstat_args
+        with_pid = netstat_args == ("-anu",)
 
         try:
             # Solaris netstat с опцией -n для числового вывода
             result = subprocess.run(
-                ["netstat", "-an", "-P", "tcp"],
-                capture_output=True,
-                text=True,
+                ["netstat", *netstat_args, "-P", "tcp"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 timeout=10
             )
 
+            if result.returncode != 0 and with_pid:
+                # Старый netstat без -u - дальше работаем без PID
+                logger.debug("netstat не поддерживает -u, PID сокетов недоступны")
+                self._netstat_args = ("-an",)
+                return self._get_listeners_netstat()
+
             if result.returncode == 0 and result.stdout:
-                lines = result.stdout.split('\n')
+                lines = result.stdout.decode('ascii', 'replace').splitlines()
 
                 for line in lines:
                     if 'LISTEN' in line:
-                        # Формат Solaris: Local Address  Remote Address  State
+                        # Формат Solaris: Local Address  Remote Address  [User  Pid  Command ...]  State
                         # Пример: *.8080  *.*  LISTEN или 0.0.0.0.8080  0.0.0.0.*  LISTEN
                         parts = line.split()
-                        if len(parts) >= 1:
+                        if parts:
                             local_addr = parts[0]
-                            # Извлекаем порт (последняя цифра после точки или звездочки)
-                            port_match = re.search(r'[.*](\d+)$', local_addr)
-                            if port_match:
-                                port = int(port_match.group(1))
-                                ports[port] = 0  # PID пока неизвестен
+                            # С -u после адресов идут User и Pid
+                            pid = int(parts[3]) if with_pid and len(parts) > 4 and parts[3].isdecimal() else 0
+
+                            # Порт - цифры после последней точки (обычный
+                            # случай) или звездочки
+                            address, _, port_str = local_addr.rpartition('.')
+                            if not (port_str.isdecimal() and port_str != local_addr):
+                                separator = local_addr.rfind('*')
+                                port_str = local_addr[separator + 1:]
+                                if separator < 0 or not port_str.isdecimal():
+                                    continue
+                                address = '*'
+
+                            loopback = address.startswith('127.') or address == '::1'
+                            listeners.append((int(port_str), pid, loopback))
 
-                logger.debug(f"Найдено {len(ports)} портов в состоянии LISTEN")
+                logger.debug(f"Найдено {len(listeners)} сокетов в состоянии LISTEN")
 
         except Exception as e:
             logger.debug(f"Ошибка при получении портов через netstat: {e}")
 
-        return ports
+        return listeners
 
-    def _get_app_port(self, app_name: str, pid: Optional[int]) -> Optional[int]:
+    def _get_listeners_cached(self) -> List[Tuple[int, int, bool]]:
+        """
+        Слушающие сокеты netstat из общего снимка.
+
+        Снимок живет NETSTAT_CACHE_TTL секунд, поэтому все приложения
+        одного прохода discover() и близкие по времени запросы используют
+        один вызов netstat. На Linux снимок строится по /proc/net/tcp[6].
+
+        Returns:
+            List[Tuple[int, int, bool]]: Список (порт, pid, адрес_loopback)
+        """
+        with self._netstat_lock:
+            now = time.monotonic()
+            if self._netstat_listeners is None or now - self._netstat_listeners[0] >= self.NETSTAT_CACHE_TTL:
+                if self.USE_PROCFS:
+                    listeners = self._read_proc_tcp_listeners()
+                else:
+                    listeners = self._get_listeners_netstat()
+                self._netstat_listeners = (now, listeners)
+            return self._netstat_listeners[1]
+
+    def _get_port_via_netstat(self, pid: int) -> Optional[int]:
+        """
+        Получение порта, который слушает процесс, из снимка netstat.
+
+        Процесс не останавливается (в отличие от pfiles). Порты, открытые
+        только на loopback (например, shutdown порт Tomcat), используются,
+        если других нет.
+
+        Args:
+            pid: PID процесса
+
+        Returns:
+            Optional[int]: Порт или None
+        """
+        loopback_port = None
+        for port, owner, loopback in self._get_listeners_cached():
+            if owner != pid:
+                continue
+            if not loopback:
+                return port
+            if loopback_port is None:
+                loopback_port = port
+        return loopback_port
+
+    def _read_proc_tcp_listeners(self) -> List[Tuple[int, int, bool]]:
+        """
+        Чтение слушающих TCP сокетов из /proc/net (Linux).
+
+        Строка таблицы: "sl local_address rem_address st ...",
+        local_address имеет вид "ADDR:PORT" в шестнадцатеричной записи.
+        PID владельца в таблице нет, поэтому он всегда равен 0.
+
+        Returns:
+            List[Tuple[int, int, bool]]: Список (порт, pid, адрес_loopback)
+        """
+        listeners = []
+        for table in self._PROC_NET_TCP:
+            try:
+                with open(os.path.join('/proc/net', table), 'r', encoding='ascii') as f:
+                    next(f, None)  # Заголовок
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) < 4 or fields[3] != self._PROC_TCP_LISTEN:
+                            continue
+                        address, _, port_hex = fields[1].rpartition(':')
+                        listeners.append((
+                            int(port_hex, 16),
+                            0,
+                            address in self._PROC_LOOPBACK_ADDRS
+                        ))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Ошибка при чтении /proc/net/{table}: {e}")
+
+        return listeners
+
+    def _get_app_port(
+        self,
+        app_name: str,
+        pid: Optional[int],
+        app_dir: Optional[str] = None
+    ) -> Optional[int]:
         """
         Получение порта приложения.
 
         Использует следующие методы в порядке приоритета:
         1. Парсинг server.xml (для Tomcat)
-        2. Поиск через netstat (менее надежно, так как не привязан к конкретному PID)
+        2. Сокеты процесса по PID из снимка netstat
+        3. Поиск через netstat (менее надежно, так как не привязан к конкретному PID)
 
         Args:
             app_name: Имя приложения
             pid: PID процесса приложения
+            app_dir: Директория приложения в app_root
 
         Returns:
             Optional[int]: Порт приложения или None
         """
         # 1. Проверяем server.xml для Tomcat
-        port = self._parse_tomcat_server_xml(app_name)
+        port = self._parse_tomcat_server_xml(app_name, app_dir)
         if port:
             logger.debug(f"{app_name}: порт {port} определен из server.xml")
             return port
 
-        # 2. Используем netstat как fallback
+        # 2. Слушающий сокет самого процесса
+        if pid:
+            port = self._get_port_via_netstat(pid)
+            if port:
+                logger.debug(f"{app_name}: порт {port} определен по сокетам процесса {pid}")
+                return port
+
+        # 3. Используем netstat как fallback
         # Внимание: этот метод не привязан к конкретному PID,
         # поэтому может быть неточным если на сервере много приложений
         logger.debug(f"{app_name}: пытаемся определить порт через netstat")
 
-        # Получаем все слушающие порты
-        listening_ports = self._get_listening_ports_netstat()
+        # Получаем все слушающие порты (один вызов netstat на проход discover)
+        listening_ports = {port for port, _, _ in self._get_listeners_cached()}
 
-        # Если нашли порты, возвращаем первый подходящий
+        # Возвращаем первый слушающий порт из типичных
         # (это эвристика, в реальности нужна дополнительная логика)
-        if listening_ports:
-            # Можно попробовать найти порт, который соответствует паттерну
-            # Например, для Java приложений это обычно 8080, 8443, 9090 и т.д.
-            common_ports = [8080, 8443, 9090, 8081, 8082, 8083]
-            for common_port in common_ports:
-                if common_port in listening_ports:
-                    logger.debug(f"{app_name}: найден типичный порт {common_port} через netstat")
-                    return common_port
-
-        logger.debug(f"{app_name}: не удалось определить порт приложения")
-        return None
+        port = next((p for p in self._COMMON_PORTS if p in listening_ports), None)
+        if port is not None:
+            logger.debug(f"{app_name}: найден типичный порт {port} через netstat")
+        else:
+            logger.debug(f"{app_name}: не удалось определить порт приложения")
+        return port
 
-    def _find_artifact(self, app_name: str) -> Tuple[Optional[Path], Optional[str]]:
+    def _find_artifact(
+        self,
+        app_name: str,
+        htdoc_links: Dict[str, str]
+    ) -> Tuple[Optional[Path], Optional[str], Optional[os.stat_result]]:
         """
         Поиск артефакта приложения (jar/war/dir).
 
@@ -335,9 +794,13 @@ class SVCAppDiscoverer(AbstractDiscoverer):
 
         Args:
             app_name: Имя приложения из app_root
+            htdoc_links: Цели симлинков htdoc_root по имени (см. _scan_htdoc_links)
 
         Returns:
-            Tuple[Optional[Path], Optional[str]]: (путь_к_артефакту, тип_артефакта)
+            Tuple[Optional[Path], Optional[str], Optional[os.stat_result]]:
+                (путь_к_артефакту, тип_артефакта, stat артефакта).
+                stat возвращается, чтобы не запрашивать его повторно
+                при сборе метаданных
         """
         # Определяем имя/путь для поиска артефакта
         htdoc_name_or_path = self.name_mapping.get(app_name, app_name)
@@ -350,84 +813,155 @@ class SVCAppDiscoverer(AbstractDiscoverer):
         if mapped_path.is_absolute():
             logger.debug(f"{app_name}: маппинг указывает на абсолютный путь {mapped_path}")
 
-            if not mapped_path.exists():
+            # Один stat вместо отдельных exists/is_dir/is_file
+            try:
+                st = mapped_path.stat()
+            except OSError:
                 logger.warning(f"{app_name}: путь из маппинга не существует: {mapped_path}")
-                return None, None
+                return None, None, None
 
             # Определяем тип артефакта по пути
-            if mapped_path.is_dir():
-                return mapped_path, 'directory'
-            elif mapped_path.is_file():
+            if stat.S_ISDIR(st.st_mode):
+                return mapped_path, 'directory', st
+            elif stat.S_ISREG(st.st_mode):
                 suffix = mapped_path.suffix.lstrip('.')
-                if suffix in self.supported_extensions:
+                if suffix in self._supported_set:
                     logger.debug(f"{app_name}: найден {suffix.upper()} файл по абсолютному пути")
-                    return mapped_path, suffix
+                    return mapped_path, suffix, st
                 else:
                     logger.warning(f"{app_name}: неподдерживаемый тип файла: {suffix}")
-                    return None, None
+                    return None, None, None
             else:
                 logger.warning(f"{app_name}: путь не является файлом или директорией: {mapped_path}")
-                return None, None
+                return None, None, None
 
         # Относительное имя - ищем в htdoc_root
         htdoc_name = htdoc_name_or_path
 
         # Проверяем артефакты в порядке приоритета
-        for artifact_type in self.ARTIFACT_CHECK_ORDER:
+        for artifact_type in self._checked_order:
             if artifact_type == 'dir':
                 # Проверяем директорию (симлинк на директорию)
-                dir_symlink = self.htdoc_root / htdoc_name
-                if dir_symlink.is_symlink() and dir_symlink.resolve().is_dir():
-                    logger.debug(f"{app_name}: найдена директория {dir_symlink}")
-                    return dir_symlink.resolve(), 'directory'
+                target = htdoc_links.get(htdoc_name)
+                if target is not None:
+                    resolved = self._stat_link_target(target)
+                    if resolved and stat.S_ISDIR(resolved[1].st_mode):
+                        logger.debug(f"{app_name}: найдена директория {self.htdoc_root / htdoc_name}")
+                        return resolved[0], 'directory', resolved[1]
             else:
                 # Проверяем файловые артефакты
-                if artifact_type not in self.supported_extensions:
-                    continue
-
-                artifact_symlink = self.htdoc_root / f"{htdoc_name}.{artifact_type}"
-                if artifact_symlink.is_symlink():
-                    resolved_path = artifact_symlink.resolve()
-                    if resolved_path.exists():
-                        logger.debug(
-                            f"{app_name}: найден {artifact_type.upper()} файл {artifact_symlink}"
-                        )
-                        return resolved_path, artifact_type
-                    else:
+                link_name = f"{htdoc_name}.{artifact_type}"
+                target = htdoc_links.get(link_name)
+                if target is not None:
+                    resolved = self._stat_link_target(target)
+                    if resolved is None:
                         logger.warning(
-                            f"{app_name}: симлинк {artifact_symlink} указывает "
-                            f"на несуществующий файл {resolved_path}"
+                            f"{app_name}: симлинк {self.htdoc_root / link_name} указывает "
+                            f"на несуществующий файл {target}"
                         )
+                        continue
+
+                    logger.debug(
+                        f"{app_name}: найден {artifact_type.upper()} файл {self.htdoc_root / link_name}"
+                    )
+                    return resolved[0], artifact_type, resolved[1]
 
         logger.debug(f"{app_name}: артефакт не найден (искали как '{htdoc_name}')")
-        return None, None
+        return None, None, None
 
-    def _build_version_pattern(self) -> re.Pattern:
+    @staticmethod
+    def _stat_link_target(target: str) -> Optional[Tuple[Path, os.stat_result]]:
         """
-        Создание regex pattern для извлечения версии из пути артефакта.
-        
-        Поддерживает форматы:
-        - /path/app-1.2.3.jar
-        - /path/20250101_120000_app-1.2.3/app-1.2.3.jar
-        - /path/20250101_120000_app-1.2.3
-        
+        Получение stat цели симлинка дистрибутива.
+
+        Цель уже прочитана readlink при сканировании htdoc_root, поэтому
+        обычно достаточно одного lstat. Если цель сама является симлинком,
+        цепочка разрешается полностью через realpath.
+
+        Args:
+            target: Путь цели симлинка
+
         Returns:
-            re.Pattern: Скомпилированное регулярное выражение
+            Optional[Tuple[Path, os.stat_result]]: (путь, stat) или None,
+                                                   если цель не существует
         """
-        # Создаем pattern для расширений: (?:\.jar|\.war)?
-        if self.supported_extensions:
-            ext_pattern = "|".join(f"\\.{ext}" for ext in self.supported_extensions)
-            ext_pattern = f"(?:{ext_pattern})?"
-        else:
-            ext_pattern = ""
-        
-        # Полный pattern
-        pattern = rf"(?:\d{{8}}_\d{{6}}_[^\/+-|\/])?([\d\.]+){ext_pattern}$"
-        return re.compile(pattern)
-    
+        try:
+            st = os.lstat(target)
+            if stat.S_ISLNK(st.st_mode):
+                target = os.path.realpath(target)
+                st = os.stat(target)
+        except OSError:
+            return None
+        return Path(target), st
+
+    def _scan_htdoc_links(self) -> Dict[str, str]:
+        """
+        Сбор симлинков htdoc_root и их целей одним проходом scandir.
+
+        Тип записи DirEntry берет из результата readdir, поэтому проверка
+        is_symlink() не требует отдельного lstat, а цель читается одним
+        readlink. Относительная цель отсчитывается от реального
+        расположения htdoc_root: оно вычисляется через realpath один раз
+        на проход, а не для каждого симлинка.
+
+        Returns:
+            Dict[str, str]: {имя_симлинка: путь_цели}
+        """
+        links = {}
+        real_root = None
+        try:
+            with os.scandir(self.htdoc_root) as entries:
+                for entry in entries:
+                    if not entry.is_symlink():
+                        continue
+                    try:
+                        target = os.readlink(entry.path)
+                    except OSError:
+                        continue
+                    if not os.path.isabs(target):
+                        if self._leading_parent_refs_only(target):
+                            # В real_root нет симлинков, поэтому ведущие ".."
+                            # можно свернуть лексически
+                            if real_root is None:
+                                real_root = os.path.realpath(self.htdoc_root)
+                            target = os.path.normpath(os.path.join(real_root, target))
+                        else:
+                            target = os.path.realpath(entry.path)
+                    links[entry.name] = target
+        except OSError as e:
+            logger.error(f"Не удалось прочитать {self.htdoc_root}: {e}")
+        return links
+
+    @staticmethod
+    def _leading_parent_refs_only(target: str) -> bool:
+        """
+        Проверка, что ".." встречаются в относительном пути только в начале.
+
+        Для такого пути (например, ../../distr/app.war) лексическая
+        нормализация от реальной директории дает тот же результат, что
+        и realpath.
+
+        Args:
+            target: Относительный путь
+
+        Returns:
+            bool: True если после первого обычного компонента нет ".."
+        """
+        parts = target.split(os.sep)
+        index = 0
+        while index < len(parts) and parts[index] == '..':
+            index += 1
+        return '..' not in parts[index:]
+
     def _extract_version(self, artifact_path: Path) -> str:
         """
         Извлечение версии из пути артефакта.
+
+        Версия - хвост имени из цифр и точек после отбрасывания расширения.
+        Поддерживает форматы:
+        - /path/app-1.2.3.jar
+        - /path/20250101_120000_app-1.2.3/app-1.2.3.jar
+        - /path/20250101_120000_app-1.2.3
         
         Args:
             artifact_path: Путь к артефакту
@@ -438,11 +972,19 @@ class SVCAppDiscoverer(AbstractDiscoverer):
         if not artifact_path:
             return "unknown-no-artifact"
         
-        pattern = self._build_version_pattern()
-        match = pattern.search(str(artifact_path))
+        # Разбор справа строковыми операциями, без регулярного выражения
+        name = artifact_path.name
+        for suffix in self._artifact_suffixes:
+            if name.endswith(suffix):
+                name = name[:-len(suffix)]
+                break
+
+        start = len(name)
+        while start and name[start - 1] in "0123456789.":
+            start -= 1
+        version = name[start:]
         
-        if match:
-            version = match.group(1)
+        if version:
             logger.debug(f"Извлечена версия {version} из {artifact_path}")
             return version
         else:
@@ -455,7 +997,9 @@ class SVCAppDiscoverer(AbstractDiscoverer):
         artifact_path: Optional[Path],
         artifact_type: Optional[str],
         pid: Optional[int] = None,
-        port: Optional[int] = None
+        port: Optional[int] = None,
+        artifact_stat: Optional[os.stat_result] = None,
+        app_dir: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Сбор метаданных об артефакте.
@@ -466,12 +1010,17 @@ class SVCAppDiscoverer(AbstractDiscoverer):
             artifact_type: Тип артефакта (jar/war/directory)
             pid: PID основного процесса приложения
             port: Порт, на котором слушает приложение
+            artifact_stat: stat артефакта, полученный при его поиске
+            app_dir: Директория приложения в app_root
 
         Returns:
             Dict[str, Any]: Словарь с метаданными
         """
         metadata = {}
 
+        if app_dir is None:
+            app_dir = str(self.app_root / app_name)
+
         # PID процесса
         if pid is not None:
             metadata["pid"] = pid
@@ -485,24 +1034,23 @@ class SVCAppDiscoverer(AbstractDiscoverer):
             metadata["port"] = None
 
         # Путь к логам
-        logs_path = self.app_root / app_name / "logs"
-        if logs_path.is_symlink():
-            metadata["log_path"] = str(logs_path.resolve())
-        else:
-            metadata["log_path"] = "Unknown"
+        metadata["log_path"] = _link_target(os.path.join(app_dir, "logs"))
         
         # Путь к дистрибутиву
         if artifact_path:
             metadata["distr_path"] = str(artifact_path)
             
             # Размер артефакта (если это файл)
-            if artifact_path.is_file():
-                try:
-                    size_bytes = artifact_path.stat().st_size
+            try:
+                if artifact_stat is None:
+                    artifact_stat = artifact_path.stat()
+                if stat.S_ISREG(artifact_stat.st_mode):
+                    size_bytes = artifact_stat.st_size
                     metadata["artifact_size_bytes"] = size_bytes
                     metadata["artifact_size_mb"] = round(size_bytes / (1024 * 1024), 2)
-                except Exception as e:
-                    logger.warning(f"Не удалось получить размер файла {artifact_path}: {e}")
+            except OSError:
+                # Артефакт недоступен - размер не указываем
+                pass
         else:
             metadata["distr_path"] = "Unknown"
         
@@ -512,82 +1060,188 @@ class SVCAppDiscoverer(AbstractDiscoverer):
            
         
         # Путь к приложению
-        metadata["app_path"] = str(self.app_root / app_name)
+        metadata["app_path"] = app_dir
         
         return metadata
 
+    def _build_app_info(
+        self,
+        name: str,
+        statuses: Dict[str, Tuple[str, str]],
+        pids: Dict[str, Optional[int]],
+        htdoc_links: Dict[str, str],
+        app_dirs: Dict[str, str]
+    ) -> Optional[ApplicationInfo]:
+        """
+        Сбор информации об одном приложении.
+
+        Args:
+            name: Имя приложения
+            statuses: Статусы, полученные общим вызовом svcs
+            pids: PID, полученные общим вызовом svcs -p
+            htdoc_links: Цели симлинков htdoc_root по имени
+            app_dirs: Директории приложений в app_root по имени
+
+        Returns:
+            Optional[ApplicationInfo]: Информация о приложении или None,
+                                       если приложение пропущено
+        """
+        app_dir = app_dirs.get(name)
+
+        try:
+            # Статус из общего вызова svcs; если сервис не попал
+            # в общий вывод - запрашиваем его отдельно
+            if name in statuses:
+                status, start_time = statuses[name]
+            else:
+                status, start_time = self._get_app_status(name)
+
+            if status in self.STOPPED_STATES:
+                # У остановленного сервиса нет процесса; порт из server.xml -
+                # статическая конфигурация и известен независимо от состояния
+                pid = None
+                port = self._parse_tomcat_server_xml(name, app_dir)
+            else:
+                # PID процесса - также из общего вызова svcs -p
+                if name in pids:
+                    pid = pids[name]
+                else:
+                    pid = self._get_app_pid(name)
+
+                # Получаем порт приложения
+                port = self._get_app_port(name, pid, app_dir)
+
+            # Находим артефакт
+            artifact_path, artifact_type, artifact_stat = self._find_artifact(name, htdoc_links)
+
+            # Пропускаем приложения без артефакта
+            if not artifact_path:
+                logger.warning(f"{name}: артефакт не найден, приложение пропущено")
+                return None
+
+            # Извлекаем версию
+            version = self._extract_version(artifact_path)
+
+            # Собираем метаданные
+            metadata = self._get_artifact_metadata(
+                name, artifact_path, artifact_type, pid, port, artifact_stat,
+                app_dir
+            )
+
+            # Создаем объект приложения
+            app_info = ApplicationInfo(
+                name=name,
+                version=version,
+                status=status,
+                start_time=start_time,
+                metadata=metadata
+            )
+
+            logger.debug(f"Успешно обработано приложение: {name}")
+            return app_info
+
+        except Exception as e:
+            logger.error(f"Ошибка при обработке приложения {name}: {e}", exc_info=True)
+            return None
+
     def discover(self) -> List[ApplicationInfo]:
         """
         Основной метод обнаружения приложений.
-        
+
+        Приложения обрабатываются параллельно в пуле потоков: работа
+        с каждым из них ограничена ожиданием дочерних процессов и файловой
+        системы, поэтому потоки не конкурируют за GIL.
+
+        Результат кэшируется на Config.SVC_DISCOVERY_CACHE_TTL секунд;
+        кэш сбрасывается раньше, если изменилось время модификации
+        директорий приложений или дистрибутивов. Из кэша возвращается
+        тот же объект списка: по нему DiscoveryManager определяет, что
+        данные не менялись. Возвращаемый список не должен изменяться.
+
         Returns:
             List[ApplicationInfo]: Список обнаруженных приложений
         """
         apps = []
+        started = time.monotonic()
 
-        # Проверяем существование директорий
-        if not (self.app_root.exists() and self.htdoc_root.exists()):
+        # Проверяем существование директорий (заодно получаем mtime для кэша)
+        roots_mtime = self._get_roots_mtime()
+        if roots_mtime is None:
             logger.error(
                 f"Требуемые директории не существуют. "
                 f"app_root={self.app_root}, htdoc_root={self.htdoc_root}"
             )
             return []
-        try:
-            # Получаем список приложений
-            app_names = {
-                app_dir.name
-                for app_dir in self.app_root.iterdir()
-                if app_dir.is_dir()
-            }
 
-            logger.debug(f"Обнаружено приложений в {self.app_root}: {len(app_names)}")
+        with self._cache_lock:
+            cached = self._cache
+        if cached is not None:
+            cached_at, cached_mtime, cached_apps = cached
+            if cached_mtime == roots_mtime and started - cached_at < Config.SVC_DISCOVERY_CACHE_TTL:
+                logger.debug(f"Используется кэш обнаружения ({len(cached_apps)} приложений)")
+                return cached_apps
 
-            # Обрабатываем каждое приложение
-            # Наличие артефакта проверяется в _find_artifact() с учетом маппинга
-            for name in sorted(app_names):
-                try:
-                    # Получаем статус через svcs
-                    status, start_time = self._get_app_status(name)
+        try:
+            # Получаем список приложений; DirEntry берет тип файла из
+            # результата readdir, без отдельного stat на каждую запись.
+            # Путь из DirEntry передается дальше, чтобы не собирать
+            # пути приложения заново
+            with os.scandir(self.app_root) as entries:
+                app_dirs = {entry.name: entry.path for entry in entries if entry.is_dir()}
 
-                    # Получаем PID процесса
-                    pid = self._get_app_pid(name)
+            logger.debug(f"Обнаружено приложений в {self.app_root}: {len(app_dirs)}")
 
-                    # Получаем порт приложения
-                    port = self._get_app_port(name, pid)
+            app_names = sorted(app_dirs)
 
-                    # Находим артефакт
-                    artifact_path, artifact_type = self._find_artifact(name)
+            # Статусы и PID всех приложений получаем общими вызовами
+            # svcs, запущенными одновременно. Остановленные сервисы
+            # выводятся в svcs -p одной строкой, поэтому отдельный
+            # отбор работающих сервисов не нужен
+            statuses_future = self._executor.submit(self._get_all_statuses, app_names)
+            pids_future = self._executor.submit(self._get_all_pids, app_names)
 
-                    # Пропускаем приложения без артефакта
-                    if not artifact_path:
-                        logger.warning(f"{name}: артефакт не найден, приложение пропущено")
-                        continue
+            # Пока svcs работает, читаем дистрибутивы одним проходом
+            # по htdoc_root
+            htdoc_links = self._scan_htdoc_links()
 
-                    # Извлекаем версию
-                    version = self._extract_version(artifact_path)
-
-                    # Собираем метаданные
-                    metadata = self._get_artifact_metadata(name, artifact_path, artifact_type, pid, port)
-                    
-                    # Создаем объект приложения
-                    app_info = ApplicationInfo(
-                        name=name,
-                        version=version,
-                        status=status,
-                        start_time=start_time,
-                        metadata=metadata
-                    )
+            statuses = statuses_future.result()
+            pids = pids_future.result()
+
+            # Обрабатываем каждое приложение
+            # Наличие артефакта проверяется в _find_artifact() с учетом маппинга
+            build_app_info = partial(
+                self._build_app_info,
+                statuses=statuses,
+                pids=pids,
+                htdoc_links=htdoc_links,
+                app_dirs=app_dirs
+            )
+            # map сохраняет порядок приложений
+            apps = [app for app in self._executor.map(build_app_info, app_names) if app]
 
-                    apps.append(app_info)
-                    logger.debug(f"Успешно обработано приложение: {name}")
-                    
-                except Exception as e:
-                    logger.error(f"Ошибка при обработке приложения {name}: {e}", exc_info=True)
-                    continue
-            
             logger.info(f"Обнаружение завершено. Найдено приложений: {len(apps)}")
-            
+
+            with self._cache_lock:
+                self._cache = (started, roots_mtime, apps)
+
         except Exception as e:
             logger.error(f"Критическая ошибка в процессе обнаружения: {e}", exc_info=True)
-        
-        return apps
\ No newline at end of file
+
+        return apps
+
+    def _get_roots_mtime(self) -> Optional[Tuple[int, int]]:
+        """
+        Получение времени модификации директорий приложений и дистрибутивов.
+
+        Returns:
+            Optional[Tuple[int, int]]: (mtime app_root, mtime htdoc_root)
+                                       в наносекундах или None, если
+                                       директория недоступна
+        """
+        try:
+            return (
+                os.stat(self.app_root).st_mtime_ns,
+                os.stat(self.htdoc_root).st_mtime_ns,
+            )
+        except OSError:
+            return None
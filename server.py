@@ -1,11 +1,14 @@
 # server.py
+import io
 import json
 import socket
 import urllib.parse
 import logging
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
+import threading
+import time
+from email.message import Message
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
 
 from models import ApplicationInfo
 from discovery import DiscoveryManager
@@ -14,6 +17,13 @@ from control_manager import ControlManager
 
 logger = logging.getLogger(__name__)
 
+# orjson (если установлен) сериализует ответы в C/Rust;
+# без него используется модуль json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def get_hostname() -> str:
     """Получает имя хоста."""
     try:
@@ -31,6 +41,26 @@ def get_ip_address() -> str:
         return "0.0.0.0"
 
 
+# Сдвиг метки last_update относительно локального времени хоста (секунды)
+_LAST_UPDATE_OFFSET_SECONDS = 7 * 3600
+
+# Имя и IP хоста не меняются за время работы агента: вычисляются один раз,
+# а не на каждый запрос (gethostbyname может обращаться к DNS)
+HOSTNAME = get_hostname()
+IP_ADDRESS = get_ip_address()
+
+
+def refresh_network_identity() -> None:
+    """Перечитывает имя и IP хоста (например, по SIGHUP)."""
+    global HOSTNAME, IP_ADDRESS
+    HOSTNAME = get_hostname()
+    IP_ADDRESS = get_ip_address()
+
+    # Кэшированный ответ /app содержит старые значения
+    with AgentRequestHandler._app_response_lock:
+        AgentRequestHandler._app_response = None
+
+
 class AgentRequestHandler(BaseHTTPRequestHandler):
     """Обработчик HTTP-запросов."""
 
@@ -38,40 +68,176 @@ class AgentRequestHandler(BaseHTTPRequestHandler):
     discovery_manager: DiscoveryManager = None
     control_manager: ControlManager = None
 
-    def _set_headers(self, status_code=200):
+    # Кэш ответа /app: (снимок приложений, данные ответа, компактный JSON).
+    # Пересчитывается только при смене снимка в DiscoveryManager
+    _app_response: Optional[Tuple[Tuple[ApplicationInfo, ...], Dict[str, Any], bytes]] = None
+    _app_response_lock = threading.Lock()
+
+    # Неизменные ответы сериализуются один раз (компактный JSON)
+    _PING_BODY = b'{"status":"ok"}'
+    _NOT_FOUND_BODY = b'{"error":"Not Found"}'
+
+    # Ответы 405 для контроллеров без GET: {имя контроллера: тело}.
+    # Заполняется в setup_handler() по загруженным контроллерам
+    _no_get_bodies: Dict[str, bytes] = {}
+
+    # Префикс URL API контроллеров
+    API_PREFIX = "/api/v1/"
+
+    # Тело до этого размера отправляется вместе с заголовками (байты)
+    COALESCE_BODY_BYTES = 65536
+
+    def setup(self) -> None:
+        """Отключает алгоритм Нейгла для TCP соединения клиента."""
+        super().setup()
+        try:
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            # Не TCP сокет - опция не применима
+            pass
+
+    @staticmethod
+    def _dumps(data: Any, pretty: bool = False) -> bytes:
+        """
+        Сериализует данные в JSON.
+
+        С orjson не-ASCII символы выводятся как UTF-8, а не \\uXXXX;
+        оба варианта - корректный JSON в UTF-8.
+
+        Args:
+            data: Данные для сериализации
+            pretty: Форматировать с отступами
+
+        Returns:
+            bytes: JSON в UTF-8
+        """
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(data, option=option)
+
+        if pretty:
+            return json.dumps(data, indent=2).encode("utf-8")
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def _loads(data: bytes) -> Any:
+        """
+        Разбирает JSON тело запроса прямо из байтов, без decode().
+
+        Args:
+            data: Тело запроса
+
+        Returns:
+            Any: Разобранные данные
+
+        Raises:
+            json.JSONDecodeError: Если тело не является корректным JSON
+                                  (orjson.JSONDecodeError - его подкласс)
+        """
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def _parse_request(self) -> None:
+        """
+        Разбирает URL запроса один раз за запрос.
+
+        Сохраняет путь без query параметров в self._url_path и query
+        параметры в self._query. Путь без '?' и '#' (например, /ping)
+        используется как есть, без urlsplit.
+        """
+        raw_path = self.path
+        if raw_path.startswith('/') and '?' not in raw_path and '#' not in raw_path:
+            self._url_path = raw_path
+            self._query = {}
+            return
+
+        url = urllib.parse.urlsplit(raw_path)
+        self._url_path = url.path
+        self._query = dict(urllib.parse.parse_qsl(url.query)) if url.query else {}
+
+    def _wants_pretty(self) -> bool:
+        """Запрошен ли форматированный вывод (?pretty=1 или Config.DEBUG_JSON)."""
+        return Config.DEBUG_JSON or self._query.get("pretty") == "1"
+
+    def _send_json(self, data: Any, status_code: int = 200) -> None:
+        """
+        Отправляет JSON ответ.
+
+        По умолчанию JSON компактный (без отступов и пробелов); форматированный
+        вывод включается параметром ?pretty=1. Заголовок Content-Length
+        позволяет клиенту не ждать закрытия соединения.
+
+        Args:
+            data: Данные для сериализации
+            status_code: HTTP статус ответа
+        """
+        self._send_body(self._dumps(data, self._wants_pretty()), status_code)
+
+    def _send_body(self, body: bytes, status_code: int = 200) -> None:
+        """
+        Отправляет готовое JSON тело ответа.
+
+        Args:
+            body: Сериализованный JSON
+            status_code: HTTP статус ответа
+        """
         self.send_response(status_code)
         self.send_header("Content-Type", "application/json")
-        self.end_headers()
+        self.send_header("Content-Length", str(len(body)))
+
+        # Буфер заголовков создается только для HTTP/1.x (у HTTP/0.9 заголовков нет)
+        headers_buffer = getattr(self, '_headers_buffer', None)
+        if headers_buffer is not None and len(body) <= self.COALESCE_BODY_BYTES:
+            # Заголовки и небольшое тело уходят одним вызовом send
+            headers_buffer.append(b"\r\n")
+            headers_buffer.append(body)
+            self.flush_headers()
+        else:
+            # Большое тело не копируется ради объединения с заголовками
+            self.end_headers()
+            self.wfile.write(body)
 
     def _send_error_response(self, code, message):
-        self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.end_headers()
-        self.wfile.write(json.dumps({"error": message}).encode("utf-8"))
+        self._send_json({"error": message}, code)
 
-    def _get_url_path_parts(self) -> List[str]:
-        """Разбирает URL путь на части."""
-        return [part for part in urllib.parse.urlparse(self.path).path.split('/') if part]             
+    def _send_not_found(self) -> None:
+        """Отправляет ответ 404 Not Found."""
+        if self._wants_pretty():
+            self._send_error_response(404, "Not Found")
+        else:
+            self._send_body(self._NOT_FOUND_BODY, 404)
 
-    def do_GET(self):
-        parts = self._get_url_path_parts()
+    def _get_app_response(self) -> Tuple[Dict[str, Any], bytes]:
+        """
+        Возвращает данные и сериализованное тело ответа /app.
 
-        if self.path == "/ping":
-            self._set_headers()
-            self.wfile.write(json.dumps({"status": "ok"}).encode("utf-8"))
-            return
+        Пока DiscoveryManager отдает тот же снимок приложений, ответ
+        не собирается и не сериализуется повторно. last_update - время
+        формирования снимка, обновляется с каждым новым снимком.
+
+        Returns:
+            Tuple[Dict[str, Any], bytes]: (данные ответа, компактный JSON)
+        """
+        apps = self.discovery_manager.get_snapshot()
 
-        #elif self.path == "/api/v1/apps":
-        elif self.path == "/app":
-            apps = self.discovery_manager.run_discovery()
+        with AgentRequestHandler._app_response_lock:
+            cached = AgentRequestHandler._app_response
+            if cached is not None and cached[0] is apps:
+                return cached[1], cached[2]
 
-            # Формируем метку времени в формате YYYYMMDD_HHMMSS с добавлением 4 часов
-            last_update = (datetime.now() + timedelta(hours=7)).strftime("%Y%m%d_%H%M%S")
+            # Формируем метку времени в формате YYYYMMDD_HHMMSS с добавлением 7 часов
+            last_update = time.strftime(
+                "%Y%m%d_%H%M%S",
+                time.localtime(time.time() + _LAST_UPDATE_OFFSET_SECONDS)
+            )
 
             response_data = {
                 "server": {
-                    "name": get_hostname(),
-                    "ip": get_ip_address(),
+                    "name": HOSTNAME,
+                    "ip": IP_ADDRESS,
                     "site-app": {
                         "applications": [app.to_dict() for app in apps],
                         "count": str(len(apps)),
@@ -79,103 +245,173 @@ class AgentRequestHandler(BaseHTTPRequestHandler):
                     }
                 }
             }
-            self._set_headers()
-            self.wfile.write(json.dumps(response_data, indent=4).encode("utf-8"))
-            return
+            body = self._dumps(response_data)
+            AgentRequestHandler._app_response = (apps, response_data, body)
+            return response_data, body
 
-        # Обработка API GET запросов для контроллеров
-        # URL: /api/v1/{controller_name}/...
-        if len(parts) >= 3 and parts[0:2] == ['api', 'v1']:
-            controller_name = parts[2]
+    def _get_url_path_parts(self) -> Tuple[str, ...]:
+        """Разбирает URL путь на части."""
+        return tuple(part for part in self._url_path.split('/') if part)
+
+    def _get_api_parts(self) -> Optional[List[str]]:
+        """
+        Разбирает на части путь после /api/v1/.
+
+        Остается списком: срезы передаются контроллерам, API которых
+        принимает List[str].
+
+        Returns:
+            Optional[List[str]]: Части пути ([controller_name, ...])
+                                 или None, если это не API запрос
+        """
+        path = self._url_path
+        if not path.startswith(self.API_PREFIX):
+            return None
+        return [part for part in path[len(self.API_PREFIX):].split('/') if part]
+
+    def _handle_ping(self) -> None:
+        """GET /ping - health check агента."""
+        if self._wants_pretty():
+            self._send_json({"status": "ok"})
+        else:
+            self._send_body(self._PING_BODY)
+
+    def _handle_app(self) -> None:
+        """GET /app - список обнаруженных приложений."""
+        response_data, body = self._get_app_response()
+        if self._wants_pretty():
+            body = self._dumps(response_data, pretty=True)
+        self._send_body(body)
+
+    @staticmethod
+    def _no_get_message(controller_name: str) -> str:
+        """Текст ошибки 405 для контроллера без поддержки GET."""
+        return f"Controller '{controller_name}' does not support GET requests"
+
+    def _handle_controller_get(self, api_parts: List[str]) -> bool:
+        """
+        Обработка API GET запросов для контроллеров.
+
+        URL: /api/v1/{controller_name}/...
+
+        Args:
+            api_parts: Части URL пути после /api/v1/
+
+        Returns:
+            bool: False, если контроллер не найден (ответ не отправлен)
+        """
+        controller_name = api_parts[0]
+
+        # Получаем обработчики контроллера
+        handlers = self.control_manager.get_handlers(controller_name)
+
+        if not handlers:
+            # Контроллер не найден - пропускаем дальше (будет 404)
+            return False
+
+        # Проверяем, поддерживает ли контроллер GET запросы
+        handle_get = handlers[0]
+        if handle_get is None:
+            # Контроллер не поддерживает GET
+            body = self._no_get_bodies.get(controller_name)
+            if body is not None and not self._wants_pretty():
+                self._send_body(body, 405)
+            else:
+                self._send_error_response(405, self._no_get_message(controller_name))
+            return True
 
-            # Получаем контроллер
-            controller = self.control_manager.get_controller(controller_name)
+        try:
+            # Путь после /api/v1/{controller_name}/; query параметры
+            # разобраны в _parse_request (копия - на случай их изменения)
+            result = handle_get(api_parts[1:], dict(self._query))
 
-            if not controller:
-                # Контроллер не найден - пропускаем дальше (будет 404)
-                pass
-            else:
-                # Проверяем, поддерживает ли контроллер GET запросы
-                if hasattr(controller, 'handle_get'):
-                    try:
-                        # Извлекаем путь после /api/v1/{controller_name}/
-                        resource_path = parts[3:]
-
-                        # Парсим query параметры
-                        parsed_url = urllib.parse.urlparse(self.path)
-                        query_params = dict(urllib.parse.parse_qsl(parsed_url.query))
-
-                        # Вызываем handle_get контроллера
-                        result = controller.handle_get(resource_path, query_params)
-
-                        # Отправляем ответ
-                        status_code = result.get('status_code', 200)
-                        self._set_headers(status_code)
-                        self.wfile.write(json.dumps(result, indent=2).encode("utf-8"))
-                        return
-
-                    except Exception as e:
-                        logger.error(f"Ошибка обработки GET запроса к контроллеру '{controller_name}': {e}", exc_info=True)
-                        self._send_error_response(500, f"Internal error: {str(e)}")
-                        return
-                else:
-                    # Контроллер не поддерживает GET
-                    self._send_error_response(405, f"Controller '{controller_name}' does not support GET requests")
-                    return
+            # Отправляем ответ
+            status_code = result.get('status_code', 200)
+            self._send_json(result, status_code)
 
-        # 404 для всех остальных путей
-        self._set_headers(404)
-        self.wfile.write(json.dumps({"error": "Not Found"}).encode("utf-8"))
+        except Exception as e:
+            logger.error(f"Ошибка обработки GET запроса к контроллеру '{controller_name}': {e}", exc_info=True)
+            self._send_error_response(500, f"Internal error: {str(e)}")
 
+        return True
 
-    def do_POST(self):
-        parts = self._get_url_path_parts()
+    # Обработчики GET запросов с фиксированным путем
+    GET_ROUTES = {
+        "/ping": _handle_ping,
+        #"/api/v1/apps": _handle_app,
+        "/app": _handle_app,
+    }
 
-        # Проверяем минимальную длину пути
-        if len(parts) < 3:
-            self._send_error_response(400, "Invalid request path")
+    def do_GET(self):
+        self._parse_request()
+
+        # Путь без query параметров (например, ?pretty=1)
+        handler = self.GET_ROUTES.get(self._url_path)
+        if handler is not None:
+            handler(self)
             return
 
-        # Проверяем, что это API запрос
-        if parts[0:2] != ['api', 'v1']:
-            self._send_error_response(404, "Not Found")
+        api_parts = self._get_api_parts()
+        if api_parts:
+            if self._handle_controller_get(api_parts):
+                return
+
+        # 404 для всех остальных путей
+        self._send_not_found()
+
+    def do_POST(self):
+        self._parse_request()
+        api_parts = self._get_api_parts()
+
+        if not api_parts:
+            # Путь короче /api/v1/{controller_name} - некорректный запрос,
+            # остальные пути вне API - не найдены
+            if api_parts is None and len(self._get_url_path_parts()) >= 3:
+                self._send_not_found()
+            else:
+                self._send_error_response(400, "Invalid request path")
             return
 
-        controller_name = parts[2]
+        controller_name = api_parts[0]
 
         # Вариант 1: Новый API - прямой доступ /api/v1/haproxy/...
         # Вариант 2: Старый API - /api/v1/control/{controller_name}/...
-        if controller_name == 'control' and len(parts) >= 4:
+        if controller_name == 'control' and len(api_parts) >= 2:
             # Старый формат: /api/v1/control/{controller_name}/...
-            controller_name = parts[3]
-            action_path = parts[4:]
+            controller_name = api_parts[1]
+            action_path = api_parts[2:]
         else:
             # Новый формат: /api/v1/{controller_name}/...
-            action_path = parts[3:]
+            action_path = api_parts[1:]
 
-        # Получаем контроллер
-        controller = self.control_manager.get_controller(controller_name)
+        # Получаем обработчики контроллера
+        handlers = self.control_manager.get_handlers(controller_name)
 
-        if not controller:
+        if not handlers:
             self._send_error_response(404, f"Controller '{controller_name}' not found")
             return
+        handle_action = handlers[1]
 
         try:
             # Читаем и парсим тело запроса
             content_length = int(self.headers.get('Content-Length', 0))
+            if content_length > Config.MAX_POST_BYTES:
+                self._send_error_response(
+                    413, f"Request body too large (limit {Config.MAX_POST_BYTES} bytes)"
+                )
+                return
+
             if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                body = json.loads(post_data.decode('utf-8'))
+                body = self._loads(self.rfile.read(content_length))
             else:
                 body = {}
 
             # Вызываем handle_action контроллера
-            result = controller.handle_action(action_path, body)
+            result = handle_action(action_path, body)
 
             # Отправляем ответ
             status_code = result.get('status_code', 200)
-            self._set_headers(status_code)
-            self.wfile.write(json.dumps(result, indent=2).encode("utf-8"))
+            self._send_json(result, status_code)
 
         except json.JSONDecodeError as e:
             logger.error(f"Ошибка парсинга JSON: {e}")
@@ -189,16 +425,58 @@ class AgentRequestHandler(BaseHTTPRequestHandler):
         """Отключаем стандартный логгинг HTTP-сервера, чтобы управлять им централизованно."""
         pass
 
-def run_server(discovery_manager: DiscoveryManager, control_manager: ControlManager = None):
+class _CapturedRequest(AgentRequestHandler):
     """
-    Создает HTTP-сервер и возвращает его экземпляр.
+    Запрос, обработанный логикой AgentRequestHandler без сокета.
+
+    Маршрутизация и формирование ответов общие для всех серверов:
+    вместо записи в сокет ответ сохраняется в self.response.
+    """
+
+    def __init__(self, path: str, headers: Message, body: bytes):
+        # BaseHTTPRequestHandler.__init__ сам читает и обслуживает сокет,
+        # поэтому не вызывается: заполняем только то, что используют do_GET/do_POST
+        self.path = path
+        self.headers = headers
+        self.rfile = io.BytesIO(body)
+        self.response: Tuple[int, bytes] = (500, b'')
+
+    def _send_body(self, body: bytes, status_code: int = 200) -> None:
+        self.response = (status_code, body)
+
+
+def dispatch_request(method: str, path: str, headers: Message, body: bytes) -> Tuple[int, bytes]:
+    """
+    Обрабатывает запрос, полученный любым сетевым сервером агента.
+
+    Выполняется синхронно и может блокироваться (обнаружение, запросы
+    к HAProxy), поэтому асинхронный сервер вызывает ее в пуле потоков.
+
+    Args:
+        method: HTTP метод (GET или POST)
+        path: Путь запроса с query параметрами
+        headers: Заголовки запроса
+        body: Тело запроса
+
+    Returns:
+        Tuple[int, bytes]: (HTTP статус, JSON тело ответа)
+    """
+    request = _CapturedRequest(path, headers, body)
+    if method == 'POST':
+        request.do_POST()
+    else:
+        request.do_GET()
+    return request.response
+
+
+def setup_handler(discovery_manager: DiscoveryManager, control_manager: ControlManager = None) -> None:
+    """
+    Внедряет менеджеры в AgentRequestHandler.
 
     Args:
         discovery_manager: Менеджер обнаружения приложений
         control_manager: Менеджер контроллеров (опционально)
     """
-    server_address = (Config.SERVER_HOST, Config.SERVER_PORT)
-
     # Внедряем менеджеры в обработчик
     AgentRequestHandler.discovery_manager = discovery_manager
 
@@ -209,8 +487,33 @@ def run_server(discovery_manager: DiscoveryManager, control_manager: ControlMana
 
     AgentRequestHandler.control_manager = control_manager
 
-    # Создаем сервер
-    httpd = HTTPServer(server_address, AgentRequestHandler)
+    # Ответы 405 известны заранее для каждого контроллера без GET
+    AgentRequestHandler._no_get_bodies = {
+        name: AgentRequestHandler._dumps(
+            {"error": AgentRequestHandler._no_get_message(name)}
+        )
+        for name, (handle_get, _) in control_manager.handlers.items()
+        if handle_get is None
+    }
+
+
+def run_server(discovery_manager: DiscoveryManager, control_manager: ControlManager = None):
+    """
+    Создает HTTP-сервер и возвращает его экземпляр.
+
+    Args:
+        discovery_manager: Менеджер обнаружения приложений
+        control_manager: Менеджер контроллеров (опционально)
+    """
+    server_address = (Config.SERVER_HOST, Config.SERVER_PORT)
+
+    setup_handler(discovery_manager, control_manager)
+
+    # Создаем сервер: каждый запрос обрабатывается в своем потоке, поэтому
+    # долгое обнаружение приложений не блокирует /ping и HAProxy API
+    httpd = ThreadingHTTPServer(server_address, AgentRequestHandler)
+    # Незавершенные запросы не задерживают остановку агента
+    httpd.daemon_threads = True
     logger.info(f"HTTP сервер создан на {Config.SERVER_HOST}:{Config.SERVER_PORT}")
 
-    return httpd
\ No newline at end of file
+    return httpd
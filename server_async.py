@@ -0,0 +1,255 @@
+# server_async.py
+import asyncio
+import http.client
+import io
+import logging
+import socket
+import threading
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import Optional, Tuple
+
+from config import Config
+from control_manager import ControlManager
+from discovery import DiscoveryManager
+from server import dispatch_request, setup_handler
+
+logger = logging.getLogger(__name__)
+
+# uvloop (если установлен) - цикл событий на libuv;
+# без него используется стандартный цикл asyncio
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+class AsyncAgentServer:
+    """
+    HTTP/1.1 сервер агента на asyncio.
+
+    Соединения (в том числе keep-alive) обслуживает один цикл событий;
+    обработчики, которые могут блокироваться (обнаружение, запросы
+    к HAProxy), выполняются в пуле потоков цикла. Интерфейс запуска
+    и остановки совпадает с socketserver: serve_forever() / shutdown().
+    """
+
+    # Пути, обработка которых не блокируется и выполняется прямо в цикле событий
+    INLINE_PATHS = frozenset({"/ping"})
+
+    # Максимальный размер строки запроса и заголовков
+    MAX_HEADER_BYTES = 65536
+
+    _UNSUPPORTED_METHOD_BODY = b'{"error":"Unsupported method"}'
+    _BAD_REQUEST_BODY = b'{"error":"Bad request"}'
+    _TOO_LARGE_BODY = b'{"error":"Request body too large"}'
+
+    def __init__(self, server_address: Tuple[str, int]):
+        """
+        Создает слушающий сокет сервера.
+
+        Args:
+            server_address: (хост, порт)
+
+        Raises:
+            OSError: Если адрес недоступен (например, порт занят)
+        """
+        self.server_address = server_address
+        self.socket = socket.create_server(server_address, backlog=128)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._is_shut_down = threading.Event()
+        self._is_shut_down.set()
+
+    def serve_forever(self) -> None:
+        """Обслуживает запросы до вызова shutdown()."""
+        self._is_shut_down.clear()
+        loop_factory = uvloop.new_event_loop if uvloop is not None else None
+        try:
+            with asyncio.Runner(loop_factory=loop_factory) as runner:
+                runner.run(self._serve())
+        finally:
+            self.socket.close()
+            self._is_shut_down.set()
+
+    def shutdown(self) -> None:
+        """
+        Останавливает serve_forever() и ждет его завершения.
+
+        Вызывается из другого потока, как и socketserver.BaseServer.shutdown().
+        """
+        loop, stop = self._loop, self._stop
+        if loop is not None and stop is not None:
+            loop.call_soon_threadsafe(stop.set)
+        self._is_shut_down.wait()
+
+    async def _serve(self) -> None:
+        """Принимает соединения, пока не установлено событие остановки."""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+
+        server = await asyncio.start_server(
+            self._handle_connection,
+            sock=self.socket,
+            limit=self.MAX_HEADER_BYTES
+        )
+        async with server:
+            await self._stop.wait()
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Обслуживание одного соединения.
+
+        Запросы в соединении обрабатываются последовательно, пока клиент
+        поддерживает keep-alive и не превышен Config.KEEPALIVE_TIMEOUT простоя
+        (он же ограничивает чтение тела запроса).
+
+        Args:
+            reader: Поток чтения соединения
+            writer: Поток записи соединения
+        """
+        try:
+            while True:
+                try:
+                    async with asyncio.timeout(Config.KEEPALIVE_TIMEOUT):
+                        head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError, TimeoutError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write_response(writer, 431, self._BAD_REQUEST_BODY, False)
+                    break
+
+                request_line, _, header_block = head.partition(b'\r\n')
+                parts = request_line.decode('latin-1').split()
+                headers = http.client.parse_headers(io.BytesIO(header_block))
+                try:
+                    method, path, version = parts
+                    content_length = int(headers.get('Content-Length', 0))
+                    if content_length < 0:
+                        raise ValueError(content_length)
+                except ValueError:
+                    await self._write_response(writer, 400, self._BAD_REQUEST_BODY, False)
+                    break
+
+                # Тело сверх лимита не читаем: соединение закрывается
+                if content_length > Config.MAX_POST_BYTES:
+                    await self._write_response(writer, 413, self._TOO_LARGE_BODY, False)
+                    break
+
+                # Тело читается с тем же таймаутом, что и заголовки:
+                # клиент, не дославший тело, не удерживает соединение
+                try:
+                    async with asyncio.timeout(Config.KEEPALIVE_TIMEOUT):
+                        body = await reader.readexactly(content_length) if content_length else b''
+                except TimeoutError:
+                    break
+                keep_alive = self._is_keep_alive(version, headers)
+
+                status_code, payload = await self._dispatch(method, path, headers, body)
+                await self._write_response(writer, status_code, payload, keep_alive)
+                if not keep_alive:
+                    break
+
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Сервер останавливается: соединение закрывается без ошибки.
+            # Отмена не пробрасывается, иначе asyncio логирует ее
+            # как исключение обработчика соединения
+            pass
+        except Exception as e:
+            logger.error(f"Ошибка обработки соединения: {e}", exc_info=True)
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self,
+        method: str,
+        path: str,
+        headers: http.client.HTTPMessage,
+        body: bytes
+    ) -> Tuple[int, bytes]:
+        """
+        Выполняет обработчик AgentRequestHandler для запроса.
+
+        Args:
+            method: HTTP метод
+            path: Путь запроса (с query параметрами)
+            headers: Заголовки запроса
+            body: Тело запроса
+
+        Returns:
+            Tuple[int, bytes]: (HTTP статус, JSON тело ответа)
+        """
+        if method not in ('GET', 'POST'):
+            return 501, self._UNSUPPORTED_METHOD_BODY
+
+        if method == 'GET' and path in self.INLINE_PATHS:
+            return dispatch_request(method, path, headers, body)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, dispatch_request, method, path, headers, body
+        )
+
+    @staticmethod
+    def _is_keep_alive(version: str, headers: http.client.HTTPMessage) -> bool:
+        """Оставлять ли соединение открытым после ответа."""
+        connection = headers.get('Connection', '').lower()
+        if version == 'HTTP/1.1':
+            return connection != 'close'
+        return connection == 'keep-alive'
+
+    @staticmethod
+    async def _write_response(
+        writer: asyncio.StreamWriter,
+        status_code: int,
+        body: bytes,
+        keep_alive: bool
+    ) -> None:
+        """
+        Отправляет HTTP ответ с JSON телом.
+
+        Args:
+            writer: Поток записи соединения
+            status_code: HTTP статус
+            body: JSON тело ответа
+            keep_alive: Оставить соединение открытым
+        """
+        head = (
+            f"HTTP/1.1 {status_code} {HTTPStatus(status_code).phrase}\r\n"
+            f"Date: {formatdate(usegmt=True)}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        ).encode('latin-1')
+        writer.writelines((head, body))
+        await writer.drain()
+
+
+def run_server_async(
+    discovery_manager: DiscoveryManager,
+    control_manager: ControlManager = None
+) -> AsyncAgentServer:
+    """
+    Создает asyncio HTTP-сервер и возвращает его экземпляр.
+
+    Args:
+        discovery_manager: Менеджер обнаружения приложений
+        control_manager: Менеджер контроллеров (опционально)
+    """
+    server_address = (Config.SERVER_HOST, Config.SERVER_PORT)
+
+    setup_handler(discovery_manager, control_manager)
+
+    httpd = AsyncAgentServer(server_address)
+    logger.info(
+        f"asyncio HTTP сервер создан на {Config.SERVER_HOST}:{Config.SERVER_PORT} "
+        f"(цикл событий: {'uvloop' if uvloop is not None else 'asyncio'})"
+    )
+
+    return httpd